@@ -30,6 +30,9 @@ def main():
     user_id = 12345
     logger.info("User %s (ID: %d) logged in", user_name, user_id)
     
+    # Log with named fields; the message is only built if the record is written
+    logger.log_struct("INFO", "Session %(session)s opened for %(user)s", session="a1b2", user=user_name)
+    
     # Log with exception information
     try:
         result = 10 / 0
@@ -8,65 +8,69 @@ import os
 from jmtlogger import JMTLogger
 
 
-def worker_function(worker_id: int, shared_logger_name: str):
+def worker_function(worker_id: int, shared_logger_name: str, mp_queue):
     """Worker function that runs in a separate process."""
-    # Create logger in worker process
+    # Create logger in worker process; records are forwarded to the
+    # main process through the shared queue
     logger = JMTLogger(
         name=shared_logger_name,
-        log_to_console=True,
-        log_to_file=True,
-        log_file=f"multiprocess_example.log",
-        log_level="INFO"
+        log_level="INFO",
+        mp_queue=mp_queue,
+        forward_only=True
     )
     
     process_id = os.getpid()
-    logger.info(f"Worker {worker_id} started in process {process_id}")
+    logger.info("Worker %d started in process %d", worker_id, process_id)
     
     # Simulate some work with logging
     for i in range(5):
-        logger.info(f"Worker {worker_id} - Processing item {i+1}")
+        logger.info("Worker %d - Processing item %d", worker_id, i + 1)
         time.sleep(0.5)
         
         if i == 2:  # Simulate a warning
-            logger.warning(f"Worker {worker_id} - Item {i+1} required special handling")
+            logger.warning("Worker %d - Item %d required special handling", worker_id, i + 1)
     
-    logger.info(f"Worker {worker_id} completed all tasks")
+    logger.info("Worker %d completed all tasks", worker_id)
     logger.close()
 
 
 def main():
     """Demonstrate multiprocessing logger usage."""
-    # Set up the main logger
+    # One shared queue carries records from every worker to the main process
+    mp_queue = multiprocessing.SimpleQueue()
+    
+    # Set up the main logger, which owns the console and file handlers
     main_logger = JMTLogger(
         name="multiprocess_main",
         log_to_console=True,
         log_to_file=True,
         log_file="multiprocess_example.log",
-        log_level="INFO"
+        log_level="INFO",
+        mp_queue=mp_queue
     )
     
     main_logger.info("Starting multiprocessing example")
-    main_logger.info(f"Main process PID: {os.getpid()}")
+    main_logger.info("Main process PID: %d", os.getpid())
     
     # Create multiple processes
     num_workers = 3
     processes = []
     
-    main_logger.info(f"Creating {num_workers} worker processes")
+    main_logger.info("Creating %d worker processes", num_workers)
     
     for worker_id in range(num_workers):
         process = multiprocessing.Process(
             target=worker_function,
-            args=(worker_id, "multiprocess_worker")
+            args=(worker_id, "multiprocess_worker", mp_queue)
         )
         processes.append(process)
         process.start()
-        main_logger.info(f"Started worker {worker_id} with PID: {process.pid}")
+        main_logger.info("Started worker %d with PID: %d", worker_id, process.pid)
     
     # Wait for all processes to complete
     for i, process in enumerate(processes):
         process.join()
-        main_logger.info(f"Worker {i} (PID: {process.pid}) finished")
+        main_logger.info("Worker %d (PID: %d) finished", i, process.pid)
     
     main_logger.info("All worker processes completed")
     main_logger.info("Multiprocessing example finished")
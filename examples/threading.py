@@ -20,7 +20,7 @@ def worker_thread(thread_id: int, shared_queue: queue.Queue, logger_name: str):
     )
     
     thread_name = threading.current_thread().name
-    logger.info(f"Thread {thread_id} ({thread_name}) started")
+    logger.info("Thread %d (%s) started", thread_id, thread_name)
     
     # Simulate work with shared resources
     try:
@@ -30,26 +30,26 @@ def worker_thread(thread_id: int, shared_queue: queue.Queue, logger_name: str):
                 if item is None:  # Sentinel value to stop
                     break
                 
-                logger.info(f"Thread {thread_id} processing item: {item}")
+                logger.info("Thread %d processing item: %d", thread_id, item)
                 
                 # Simulate processing time
                 time.sleep(0.3)
                 
                 # Simulate occasional errors
                 if item % 7 == 0:
-                    logger.warning(f"Thread {thread_id} - Item {item} requires special handling")
+                    logger.warning("Thread %d - Item %d requires special handling", thread_id, item)
                 
                 shared_queue.task_done()
                 
             except queue.Empty:
-                logger.debug(f"Thread {thread_id} - No items in queue, continuing...")
+                logger.debug("Thread %d - No items in queue, continuing...", thread_id)
                 break
                 
     except Exception as e:
-        logger.error(f"Thread {thread_id} encountered an error: {e}")
+        logger.error("Thread %d encountered an error: %s", thread_id, e)
         logger.exception("Full traceback:")
     
-    logger.info(f"Thread {thread_id} ({thread_name}) finished")
+    logger.info("Thread %d (%s) finished", thread_id, thread_name)
 
 
 def main():
@@ -69,7 +69,7 @@ def main():
     work_queue = queue.Queue()
     num_items = 20
     
-    main_logger.info(f"Adding {num_items} items to work queue")
+    main_logger.info("Adding %d items to work queue", num_items)
     for i in range(num_items):
         work_queue.put(i)
     
@@ -77,7 +77,7 @@ def main():
     num_threads = 4
     threads = []
     
-    main_logger.info(f"Creating {num_threads} worker threads")
+    main_logger.info("Creating %d worker threads", num_threads)
     
     for thread_id in range(num_threads):
         thread = threading.Thread(
@@ -87,7 +87,7 @@ def main():
         )
         threads.append(thread)
         thread.start()
-        main_logger.info(f"Started thread {thread_id}: {thread.name}")
+        main_logger.info("Started thread %d: %s", thread_id, thread.name)
     
     # Wait for all items to be processed
     main_logger.info("Waiting for all work items to be processed...")
@@ -100,7 +100,7 @@ def main():
     # Wait for all threads to complete
     for i, thread in enumerate(threads):
         thread.join()
-        main_logger.info(f"Thread {i} ({thread.name}) joined")
+        main_logger.info("Thread %d (%s) joined", i, thread.name)
     
     main_logger.info("All worker threads completed")
     main_logger.info("Threading example finished")
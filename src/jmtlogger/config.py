@@ -3,12 +3,30 @@ Configuration management for the multiprocessing logger.
 """
 
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Optional, Union, Any
 from pathlib import Path
 import logging
+import sys
 
 
-@dataclass
+# Level names accepted in place of numeric levels
+_LEVEL_MAP = {
+    'NOTSET': logging.NOTSET,
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'WARN': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+    'FATAL': logging.CRITICAL,
+}
+
+
+# Slotted dataclasses need Python 3.10+; older versions use a regular one
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LoggerConfig:
     """Configuration class for the JMTLogger."""
     
@@ -20,16 +38,24 @@ class LoggerConfig:
     log_dir: Optional[Union[str, Path]] = None
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     backup_count: int = 5
+    flush_threshold: int = 64 * 1024  # Buffered bytes before a file write
+    flush_interval: float = 1.0  # Max seconds a record stays buffered
+    buffer_capacity: int = 1  # Records held before dispatch in single-process mode (1 = none)
+    queue_size: int = 10000  # Max queued records before the oldest are dropped (0 = unbounded)
+    pool_records: bool = False  # Reuse LogRecord objects once they have been handled
+    format_async: bool = True  # Let the receiving process format simple args from mp_queue
     console_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(processName)s - %(threadName)s - %(message)s"
     file_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(processName)s - %(threadName)s - %(funcName)s:%(lineno)d - %(message)s"
     date_format: str = "%Y-%m-%d %H:%M:%S"
     use_colors: bool = True  # Enable colored console output
+    mp_queue: Optional[Any] = None  # Shared multiprocessing queue (not serialized)
+    forward_only: bool = False  # Only put records on mp_queue; another logger writes them
     
     def __post_init__(self) -> None:
         """Validate and normalize configuration after initialization."""
         # Convert string log level to integer
         if isinstance(self.log_level, str):
-            self.log_level = getattr(logging, self.log_level.upper(), logging.INFO)
+            self.log_level = _LEVEL_MAP.get(self.log_level.upper(), logging.INFO)
         
         # Ensure log file is specified if logging to file
         if self.log_to_file and not self.log_file:
@@ -41,8 +67,16 @@ class LoggerConfig:
         # Convert log_file to Path object
         if self.log_file:
             self.log_file = Path(self.log_file)
-            # Create directory if it doesn't exist
-            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def log_file_str(self) -> Optional[str]:
+        """The log file path as a string, or None."""
+        return str(self.log_file) if self.log_file else None
+    
+    @property
+    def log_dir_str(self) -> Optional[str]:
+        """The log directory as a string, or None."""
+        return str(self.log_dir) if self.log_dir else None
     
     @classmethod
     def from_dict(cls, config_dict: dict) -> "LoggerConfig":
@@ -56,12 +90,19 @@ class LoggerConfig:
             "log_level": self.log_level,
             "log_to_console": self.log_to_console,
             "log_to_file": self.log_to_file,
-            "log_file": str(self.log_file) if self.log_file else None,
-            "log_dir": str(self.log_dir) if self.log_dir else None,
+            "log_file": self.log_file_str,
+            "log_dir": self.log_dir_str,
             "max_file_size": self.max_file_size,
             "backup_count": self.backup_count,
+            "flush_threshold": self.flush_threshold,
+            "flush_interval": self.flush_interval,
+            "buffer_capacity": self.buffer_capacity,
+            "queue_size": self.queue_size,
+            "pool_records": self.pool_records,
+            "format_async": self.format_async,
             "console_format": self.console_format,
             "file_format": self.file_format,
             "date_format": self.date_format,
             "use_colors": self.use_colors,
+            "forward_only": self.forward_only,
         }
@@ -2,27 +2,81 @@
 Core multiprocessing logger implementation.
 """
 
+import io
 import logging
-import multiprocessing
+import os
+import sys
 import threading
-from typing import Optional, Union, Dict, Any
-from pathlib import Path
+import traceback
+from logging import DEBUG, INFO, WARNING, ERROR, CRITICAL
+import json
+from typing import Optional, Union, Dict, Any, Mapping, Tuple
 
-from .config import LoggerConfig
+from .config import LoggerConfig, _LEVEL_MAP
 from .handlers import (
+    CachedFormatter,
+    MultiprocessingHandler,
     create_console_handler,
     create_file_handler,
     create_multiprocessing_handler,
-    ColoredFormatter,
 )
 
 
+# Format fields that need the caller's frame to be looked up
+_CALLER_FIELDS = ("pathname", "filename", "module", "lineno", "funcName")
+
+# What logging records when the caller is not looked up
+_UNKNOWN_CALLER = ("(unknown file)", 0, "(unknown function)", None)
+
+
+def _find_caller(stack_info: bool = False, stacklevel: int = 1) -> Tuple[str, int, str, Optional[str]]:
+    """
+    Look up the caller like ``Logger.findCaller``, also skipping the JMTLogger
+    wrapper frames, so records point at the code calling ``JMTLogger.info``
+    and friends.
+    """
+    f = sys._getframe(1)
+    while stacklevel > 0:
+        next_f = f.f_back
+        if next_f is None:
+            break
+        f = next_f
+        if f.f_code.co_filename not in _INTERNAL_FILES:
+            stacklevel -= 1
+    co = f.f_code
+    sinfo = None
+    if stack_info:
+        with io.StringIO() as sio:
+            sio.write("Stack (most recent call last):\n")
+            traceback.print_stack(f, file=sio)
+            sinfo = sio.getvalue().rstrip("\n")
+    return co.co_filename, f.f_lineno, co.co_name, sinfo
+
+
+# Source files whose frames are never reported as the caller
+_INTERNAL_FILES = frozenset((
+    logging.Logger.findCaller.__code__.co_filename,
+    _find_caller.__code__.co_filename,
+))
+
+
 class JMTLogger:
     """
     A multiprocessing-safe logger that can handle logging from multiple
     processes and threads simultaneously.
+    
+    Loggers created with the same name share one set of handlers; the
+    handlers are closed when the last of them is closed. A logger with a
+    different configuration only rebuilds the handlers that changed.
     """
     
+    # name -> {"handler", "refs", "fingerprints", "targets", "find_caller",
+    # "make_record", "lock"} for live loggers; the registry lock only guards
+    # lookups and reference counts, and each entry's lock the building and
+    # closing of its handlers
+    _REGISTRY: Dict[str, Dict[str, Any]] = {}
+    _REGISTRY_LOCK = threading.Lock()
+    
     def __init__(
         self,
         name: str = "jmt_logger",
@@ -50,57 +104,258 @@ class JMTLogger:
         self._logger = logging.getLogger(self.name)
         self._logger.setLevel(self.config.log_level)
         
-        # Clear any existing handlers to prevent duplication
-        self._logger.handlers.clear()
+        # Suppressed calls return early through isEnabledFor, whose per-level
+        # cache is shared by every JMTLogger with this name and cleared by
+        # setLevel, so it never goes stale
+        self._enabled_for = self._logger.isEnabledFor
         
-        # Set up handlers
-        self._setup_handlers()
+        # Reuse the handlers of a live logger with this name, rebuilding
+        # only the parts whose configuration changed
+        fingerprints = self._config_fingerprints()
+        with self._REGISTRY_LOCK:
+            entry = self._REGISTRY.get(self.name)
+            if entry is None:
+                entry = self._new_entry()
+                self._REGISTRY[self.name] = entry
+            entry["refs"] += 1
+        with entry["lock"]:
+            if (entry["fingerprints"] is not None
+                    and entry["handler"] not in self._logger.handlers):
+                # Handlers were detached behind our back; start over
+                if entry["handler"] is not None:
+                    entry["handler"].close()
+                entry.update(self._new_entry(), refs=entry["refs"], lock=entry["lock"])
+            if entry["fingerprints"] is None:
+                # Clear any existing handlers to prevent duplication
+                self._logger.handlers.clear()
+            if entry["fingerprints"] != fingerprints:
+                self._apply_config(entry, fingerprints)
+            if entry["handler"] is not None:
+                entry["handler"].setLevel(self.config.log_level)
+        self._entry = entry
+        self._closed = False
         
         # Prevent propagation to root logger
         self._logger.propagate = False
     
-    def _setup_handlers(self) -> None:
-        """Set up console and/or file handlers based on configuration."""
-        # Create formatters
-        console_formatter = logging.Formatter(
+    @staticmethod
+    def _new_entry() -> Dict[str, Any]:
+        """A registry entry for a name without handlers yet."""
+        return {
+            "handler": None,
+            "refs": 0,
+            "fingerprints": None,
+            "targets": {"console": None, "file": None},
+            "find_caller": True,
+            "make_record": None,
+            "lock": threading.Lock(),
+        }
+    
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        """
+        Forget the parent's loggers in a forked child, so a logger created
+        there builds its own handlers instead of closing the parent's.
+        """
+        cls._REGISTRY_LOCK = threading.Lock()
+        for entry in cls._REGISTRY.values():
+            # Loggers inherited by the child still close through their entry
+            entry["lock"] = threading.Lock()
+        cls._REGISTRY.clear()
+    
+    def _is_forwarding(self) -> bool:
+        """Whether this logger only forwards records to a shared queue."""
+        return self.config.mp_queue is not None and self.config.forward_only
+    
+    def _config_fingerprints(self) -> Tuple[str, str, str]:
+        """Describe the configuration of the queue, console and file handlers."""
+        config = self.config
+        forwarding = self._is_forwarding()
+        queue_part = json.dumps([
+            id(config.mp_queue) if config.mp_queue is not None else None,
+            forwarding, config.buffer_capacity, config.flush_interval, config.queue_size,
+            config.pool_records, config.format_async,
+        ])
+        if forwarding:
+            # Console and file settings are not used by forwarding handlers
+            return queue_part, "", ""
+        console_part = json.dumps([
+            config.log_to_console, config.console_format,
+            config.date_format, config.use_colors,
+        ])
+        file_part = json.dumps([
+            config.log_to_file, config.log_file_str, config.max_file_size,
+            config.backup_count, config.file_format, config.date_format,
+            config.flush_threshold, config.flush_interval,
+        ])
+        return queue_part, console_part, file_part
+    
+    def _apply_config(self, entry: Dict[str, Any], fingerprints: Tuple[str, str, str]) -> None:
+        """Bring the shared handlers in entry in line with this logger's configuration."""
+        handler = entry["handler"]
+        old = entry["fingerprints"]
+        
+        if handler is not None and old[0] == fingerprints[0] and not self._is_forwarding():
+            # Same queue: only replace the console and/or file handler that changed
+            targets: Dict[str, Optional[logging.Handler]] = dict(entry["targets"])
+            if old[1] != fingerprints[1]:
+                targets["console"] = self._create_console_handler()
+            if old[2] != fingerprints[2]:
+                targets["file"] = self._create_file_handler()
+            active = [h for h in targets.values() if h is not None]
+            if active:
+                handler.set_targets(*active)
+                entry["targets"] = targets
+                entry["fingerprints"] = fingerprints
+                self._use_find_caller(entry, targets)
+                return
+        
+        # Otherwise tear everything down and rebuild
+        if handler is not None:
+            handler.close()
+            self._logger.removeHandler(handler)
+        targets = {"console": None, "file": None}
+        if not self._is_forwarding():
+            targets["console"] = self._create_console_handler()
+            targets["file"] = self._create_file_handler()
+        handler = self._setup_handlers(targets)
+        if handler is not None:
+            self._logger.addHandler(handler)
+        self._use_record_pool(entry, handler)
+        self._use_find_caller(entry, targets)
+        entry["handler"] = handler
+        entry["targets"] = targets
+        entry["fingerprints"] = fingerprints
+    
+    def _use_record_pool(self, entry: Dict[str, Any],
+                         handler: Optional[logging.Handler]) -> None:
+        """Take records from the handler's pool, if it keeps one."""
+        entry["make_record"] = None
+        if (isinstance(handler, MultiprocessingHandler) and handler.pools_records
+                and logging.getLogRecordFactory() is logging.LogRecord):
+            entry["make_record"] = handler.make_record
+    
+    def _use_find_caller(self, entry: Dict[str, Any],
+                         targets: Dict[str, Optional[logging.Handler]]) -> None:
+        """Only walk the stack for the caller if a format will show it."""
+        if self._is_forwarding():
+            # The receiving process's formats are unknown here
+            needs_caller = True
+        else:
+            formats = [
+                getattr(h.formatter, '_fmt', None) or ''
+                for h in targets.values() if h is not None
+            ]
+            needs_caller = any(field in fmt for fmt in formats for field in _CALLER_FIELDS)
+        entry["find_caller"] = needs_caller
+    
+    def _create_console_handler(self) -> Optional[logging.Handler]:
+        """Create the console handler if requested."""
+        if not self.config.log_to_console:
+            return None
+        console_formatter = CachedFormatter(
             self.config.console_format,
             datefmt=self.config.date_format
         )
-        file_formatter = logging.Formatter(
+        return create_console_handler(console_formatter, self.config.use_colors)
+    
+    def _create_file_handler(self) -> Optional[logging.Handler]:
+        """Create the file handler if requested."""
+        if not (self.config.log_to_file and self.config.log_file):
+            return None
+        file_formatter = CachedFormatter(
             self.config.file_format,
             datefmt=self.config.date_format
         )
+        return create_file_handler(
+            self.config.log_file,
+            file_formatter,
+            self.config.max_file_size,
+            self.config.backup_count,
+            self.config.flush_threshold,
+            self.config.flush_interval
+        )
+    
+    def _setup_handlers(
+        self, targets: Dict[str, Optional[logging.Handler]]
+    ) -> Optional[logging.Handler]:
+        """Wrap the console and/or file handlers in a multiprocessing handler."""
+        mp_queue = self.config.mp_queue
         
-        # Add console handler if requested
-        if self.config.log_to_console:
-            console_handler = create_console_handler(console_formatter, self.config.use_colors)
-            mp_console_handler = create_multiprocessing_handler(console_handler)
-            mp_console_handler.setLevel(self.config.log_level)
-            self._logger.addHandler(mp_console_handler)
-        
-        # Add file handler if requested
-        if self.config.log_to_file and self.config.log_file:
-            file_handler = create_file_handler(
-                self.config.log_file,
-                file_formatter,
-                self.config.max_file_size,
-                self.config.backup_count
+        # Forward-only loggers put records on the shared queue for its owner
+        if self._is_forwarding():
+            mp_handler = create_multiprocessing_handler(
+                mp_queue=mp_queue,
+                queue_size=self.config.queue_size,
+                format_async=self.config.format_async
             )
-            mp_file_handler = create_multiprocessing_handler(file_handler)
-            mp_file_handler.setLevel(self.config.log_level)
-            self._logger.addHandler(mp_file_handler)
+            mp_handler.setLevel(self.config.log_level)
+            return mp_handler
+        
+        handlers = [h for h in targets.values() if h is not None]
+        if not handlers:
+            return None
+        
+        # A single queue and listener thread serve all handlers of this logger
+        mp_handler = create_multiprocessing_handler(
+            *handlers,
+            mp_queue=mp_queue,
+            buffer_capacity=self.config.buffer_capacity,
+            flush_interval=self.config.flush_interval,
+            queue_size=self.config.queue_size,
+            pool_records=self.config.pool_records,
+            format_async=self.config.format_async
+        )
+        mp_handler.setLevel(self.config.log_level)
+        return mp_handler
+    
+    def _log(self, level: int, message: str, args: Tuple[Any, ...], exc_info: Any = None,
+             extra: Optional[Mapping[str, Any]] = None, stack_info: bool = False,
+             stacklevel: int = 1) -> None:
+        """
+        ``Logger._log`` for the wrappers below: the caller is looked up past
+        them, and only when a format shows it, without changing how code
+        using ``logging.getLogger(name)`` directly logs.
+        """
+        if stack_info or self._entry["find_caller"]:
+            fn, lno, func, sinfo = _find_caller(stack_info, stacklevel)
+        else:
+            fn, lno, func, sinfo = _UNKNOWN_CALLER
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        # Records come from the handler's pool when it keeps one, but only
+        # when no other handler can still be using them once it recycles them
+        make_record = self._entry["make_record"]
+        handlers = self._logger.handlers
+        if make_record is None or self._logger.propagate or not (
+                len(handlers) == 1 and handlers[0] is self._entry["handler"]):
+            make_record = self._logger.makeRecord
+        record = make_record(
+            self._logger.name, level, fn, lno, message, args,
+            exc_info, func, extra, sinfo
+        )
+        self._logger.handle(record)
     
     def debug(self, message: str, *args, **kwargs) -> None:
         """Log a debug message."""
-        self._logger.debug(message, *args, **kwargs)
+        if not self._enabled_for(DEBUG):
+            return
+        self._log(DEBUG, message, args, **kwargs)
     
     def info(self, message: str, *args, **kwargs) -> None:
         """Log an info message."""
-        self._logger.info(message, *args, **kwargs)
+        if not self._enabled_for(INFO):
+            return
+        self._log(INFO, message, args, **kwargs)
     
     def warning(self, message: str, *args, **kwargs) -> None:
         """Log a warning message."""
-        self._logger.warning(message, *args, **kwargs)
+        if not self._enabled_for(WARNING):
+            return
+        self._log(WARNING, message, args, **kwargs)
     
     def warn(self, message: str, *args, **kwargs) -> None:
         """Log a warning message (alias for warning)."""
@@ -108,31 +363,57 @@ class JMTLogger:
     
     def error(self, message: str, *args, **kwargs) -> None:
         """Log an error message."""
-        self._logger.error(message, *args, **kwargs)
+        if not self._enabled_for(ERROR):
+            return
+        self._log(ERROR, message, args, **kwargs)
     
     def critical(self, message: str, *args, **kwargs) -> None:
         """Log a critical message."""
-        self._logger.critical(message, *args, **kwargs)
+        if not self._enabled_for(CRITICAL):
+            return
+        self._log(CRITICAL, message, args, **kwargs)
     
     def fatal(self, message: str, *args, **kwargs) -> None:
         """Log a fatal message (alias for critical)."""
         self.critical(message, *args, **kwargs)
     
-    def exception(self, message: str, *args, **kwargs) -> None:
+    def exception(self, message: str, *args, exc_info: Any = True, **kwargs) -> None:
         """Log an exception message with traceback."""
-        self._logger.exception(message, *args, **kwargs)
+        if not self._enabled_for(ERROR):
+            return
+        self._log(ERROR, message, args, exc_info=exc_info, **kwargs)
     
     def log(self, level: Union[int, str], message: str, *args, **kwargs) -> None:
         """Log a message at the specified level."""
         if isinstance(level, str):
-            level = getattr(logging, level.upper(), logging.INFO)
-        self._logger.log(level, message, *args, **kwargs)
+            level = _LEVEL_MAP.get(level.upper(), logging.INFO)
+        if not self._enabled_for(level):
+            return
+        self._log(level, message, args, **kwargs)
+    
+    def log_struct(self, level: Union[int, str], template: str, **fields: Any) -> None:
+        """
+        Log a ``%(field)s`` template with named fields.
+        
+        The fields are kept as the record's args, so the message is only
+        built when a handler writes the record and never for suppressed levels.
+        """
+        if isinstance(level, str):
+            level = _LEVEL_MAP.get(level.upper(), logging.INFO)
+        if not self._enabled_for(level):
+            return
+        self._log(level, template, (fields,) if fields else ())
     
     def set_level(self, level: Union[int, str]) -> None:
         """Set the logging level."""
         if isinstance(level, str):
-            level = getattr(logging, level.upper(), logging.INFO)
+            level = _LEVEL_MAP.get(level.upper(), logging.INFO)
         self._logger.setLevel(level)
+        # Keep our handler's level in sync so newly enabled levels are emitted;
+        # handlers attached to the logger by others keep their own levels
+        handler = self._entry["handler"]
+        if handler is not None:
+            handler.setLevel(level)
         # Also update config
         self.config.log_level = level
     
@@ -143,14 +424,28 @@ class JMTLogger:
     def is_enabled_for(self, level: Union[int, str]) -> bool:
         """Check if logging is enabled for the specified level."""
         if isinstance(level, str):
-            level = getattr(logging, level.upper(), logging.INFO)
+            level = _LEVEL_MAP.get(level.upper(), logging.INFO)
         return self._logger.isEnabledFor(level)
     
     def close(self) -> None:
-        """Close all handlers and clean up resources."""
-        for handler in self._logger.handlers[:]:
-            handler.close()
-            self._logger.removeHandler(handler)
+        """Release the shared handlers, closing them if this was the last user."""
+        with self._REGISTRY_LOCK:
+            if self._closed:
+                return
+            self._closed = True
+            entry = self._entry
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            if self._REGISTRY.get(self.name) is entry:
+                del self._REGISTRY[self.name]
+        # Closing joins the listener thread, so other loggers are not held up
+        with entry["lock"]:
+            handler = entry["handler"]
+            entry["handler"] = None
+            if handler is not None:
+                handler.close()
+                self._logger.removeHandler(handler)
     
     def __enter__(self) -> "JMTLogger":
         """Context manager entry."""
@@ -163,3 +458,7 @@ class JMTLogger:
     def __repr__(self) -> str:
         """String representation of the logger."""
         return f"JMTLogger(name='{self.name}', level={self.get_level()})"
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=JMTLogger._reset_after_fork)
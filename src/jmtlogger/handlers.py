@@ -5,16 +5,173 @@ Custom handlers for multiprocessing-safe logging.
 import logging
 import logging.handlers
 import multiprocessing
+import multiprocessing.util
 import threading
 import queue
 import atexit
 import sys
 import os
-from typing import Optional, Any, Dict
+import time
+import weakref
+import collections
+import operator
+import locale
+import re
+from typing import Optional, Any, Callable, Dict, List, Mapping, Set, Tuple, Deque, Union
 from pathlib import Path
 
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
 
-class ColoredFormatter(logging.Formatter):
+
+# A %-style field reference, e.g. the "%(levelname)" in "%(levelname)-8s",
+# or an escaped "%%", which is matched so it is skipped
+_FIELD_PATTERN = re.compile(r"%%|%\((\w+)\)")
+
+
+class CachedFormatter(logging.Formatter):
+    """
+    A formatter that renders the timestamp once per second.
+    
+    Records created within the same second share the ``strftime`` result;
+    only the milliseconds (when no ``datefmt`` is given) differ per record.
+    
+    ``%``-style format strings are also compiled once into a positional
+    template and an attribute getter, so each record is formatted by a
+    single ``%`` on a tuple instead of going through the style object.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the formatter with an empty timestamp cache."""
+        super().__init__(*args, **kwargs)
+        # ((second, datefmt), text), replaced as a whole so threads never see a torn pair
+        self._time_cache: Tuple[Tuple[int, Optional[str]], str] = ((-1, None), "")
+        self._uses_time = super().usesTime()
+        self._template = ""
+        self._getter: Optional[Callable[[logging.LogRecord], Tuple[Any, ...]]] = None
+        fmt = self._style._fmt
+        if type(self._style) is logging.PercentStyle and not getattr(self._style, '_defaults', None):
+            fields = [f for f in _FIELD_PATTERN.findall(fmt) if f]
+            if len(fields) > 1:
+                self._template = _FIELD_PATTERN.sub(
+                    lambda m: '%' if m.group(1) else m.group(0), fmt
+                )
+                self._getter = operator.attrgetter(*fields)
+                if not self._compiles_like_style(fields):
+                    self._getter = None
+    
+    def _compiles_like_style(self, fields: List[str]) -> bool:
+        """Whether the compiled template renders a sample record like the style does."""
+        sample = logging.makeLogRecord({'msg': 'sample'})
+        sample.message = sample.getMessage()
+        for name in fields:
+            if not hasattr(sample, name):
+                setattr(sample, name, '<%s>' % name)
+        try:
+            return self.formatMessage(sample) == self._style.format(sample)
+        except (TypeError, ValueError, KeyError, AttributeError):
+            return False
+    
+    def usesTime(self) -> bool:
+        """Check if the format uses the creation time of the record (computed once)."""
+        return self._uses_time
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        """Fill the compiled template, or defer to the style for anything else."""
+        if self._getter is not None:
+            try:
+                return self._template % self._getter(record)
+            except AttributeError:
+                # Let the style report the missing field as logging does
+                pass
+        return super().formatMessage(record)
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Return the creation time of the record, reusing the text for its second."""
+        key = (int(record.created), datefmt)
+        cached = self._time_cache
+        if cached[0] != key:
+            ct = self.converter(key[0])
+            text = time.strftime(datefmt or self.default_time_format, ct)
+            cached = self._time_cache = (key, text)
+        if datefmt or not self.default_msec_format:
+            return cached[1]
+        return self.default_msec_format % (cached[1], record.msecs)
+
+
+# Terminal color support and Windows ANSI setup, each determined once per
+# file descriptor and process
+_COLOR_SUPPORTED: Dict[int, bool] = {}
+_WIN_ANSI_ENABLED: Dict[int, bool] = {}
+_COLOR_LOCK = threading.Lock()
+
+
+def _stream_fd(stream: Any) -> Optional[int]:
+    """The file descriptor behind a stream, or None if it has none."""
+    try:
+        return int(stream.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _detect_color_support(fd: int) -> bool:
+    """
+    Check if the terminal behind a file descriptor supports colors.
+    """
+    # Check if we're in a terminal
+    if not os.isatty(fd):
+        return False
+    
+    # Check environment variables
+    if os.getenv('NO_COLOR'):
+        return False
+    
+    if os.getenv('FORCE_COLOR'):
+        return True
+    
+    # Windows terminal detection
+    if sys.platform == 'win32':
+        # Windows 10 version 1511 and later support ANSI escape sequences
+        version = sys.getwindowsversion()
+        return version.major >= 10 and version.build >= 10586
+    
+    # Unix-like systems
+    term = os.getenv('TERM', '').lower()
+    if 'color' in term or term in ['xterm', 'xterm-256color', 'screen', 'linux']:
+        return True
+    
+    return False
+
+
+def _enable_windows_ansi(fd: int) -> bool:
+    """
+    Enable ANSI escape sequence processing for a Windows console; False if that fails.
+    """
+    try:
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+        
+        kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        
+        # Get the console handle behind the file descriptor
+        console_handle = msvcrt.get_osfhandle(fd)  # type: ignore[attr-defined]
+        
+        # Get current console mode
+        mode = wintypes.DWORD()
+        kernel32.GetConsoleMode(console_handle, ctypes.byref(mode))
+        
+        # Enable virtual terminal processing (ANSI escape sequences)
+        ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
+        kernel32.SetConsoleMode(console_handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING)
+        return True
+    except Exception:
+        return False
+
+
+class ColoredFormatter(CachedFormatter):
     """
     A formatter that adds color codes to log messages based on log level.
     Works on both Windows and Unix-like systems.
@@ -31,79 +188,69 @@ class ColoredFormatter(logging.Formatter):
     
     RESET = '\033[0m'
     
-    def __init__(self, *args, use_colors: bool = None, **kwargs):
+    def __init__(self, *args: Any, use_colors: Optional[bool] = None,
+                 stream: Any = None, **kwargs: Any) -> None:
         """
         Initialize the colored formatter.
         
         Args:
             use_colors: Whether to use colors. If None, auto-detect based on terminal support.
+            stream: The stream the output goes to, for detecting color support
+                (``sys.stderr``, where ``logging.StreamHandler`` writes, by default)
         """
         super().__init__(*args, **kwargs)
+        if stream is None:
+            stream = sys.stderr
         
         if use_colors is None:
             # Auto-detect color support
-            self.use_colors = self._supports_color()
+            self.use_colors = self._supports_color(stream)
         else:
             self.use_colors = use_colors
         
         # Enable ANSI color support on Windows 10+
-        if self.use_colors and os.name == 'nt':
-            self._enable_windows_ansi()
+        if self.use_colors and sys.platform == 'win32':
+            self._enable_windows_ansi(stream)
+        
+        # Precompute the (prefix, suffix) color wrapping for each level
+        self._wraps: Dict[int, Tuple[str, str]] = {}
+        if self.use_colors:
+            self._wraps = {
+                logging.getLevelName(level_name): (color, self.RESET)
+                for level_name, color in self.COLORS.items()
+            }
     
-    def _supports_color(self) -> bool:
+    def _supports_color(self, stream: Any) -> bool:
         """
-        Check if the terminal supports colors.
+        Check if the terminal behind stream supports colors (detected once
+        per file descriptor).
         """
-        # Check if we're in a terminal
-        if not hasattr(sys.stdout, 'isatty') or not sys.stdout.isatty():
-            return False
-        
-        # Check environment variables
-        if os.getenv('NO_COLOR'):
+        fd = _stream_fd(stream)
+        if fd is None:
             return False
-        
-        if os.getenv('FORCE_COLOR'):
-            return True
-        
-        # Windows terminal detection
-        if os.name == 'nt':
-            # Windows 10 version 1511 and later support ANSI escape sequences
-            try:
-                import platform
-                version = platform.version()
-                major, minor, build = map(int, version.split('.'))
-                return major >= 10 and build >= 10586
-            except:
-                return False
-        
-        # Unix-like systems
-        term = os.getenv('TERM', '').lower()
-        if 'color' in term or term in ['xterm', 'xterm-256color', 'screen', 'linux']:
-            return True
-        
-        return False
+        supported = _COLOR_SUPPORTED.get(fd)
+        if supported is None:
+            with _COLOR_LOCK:
+                supported = _COLOR_SUPPORTED.get(fd)
+                if supported is None:
+                    supported = _COLOR_SUPPORTED[fd] = _detect_color_support(fd)
+        return supported
     
-    def _enable_windows_ansi(self) -> None:
+    def _enable_windows_ansi(self, stream: Any) -> None:
         """
-        Enable ANSI escape sequence processing on Windows.
+        Enable ANSI escape sequence processing for stream's console (once
+        per file descriptor).
         """
-        try:
-            import ctypes
-            from ctypes import wintypes
-            
-            kernel32 = ctypes.windll.kernel32
-            
-            # Get stdout handle
-            stdout_handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
-            
-            # Get current console mode
-            mode = wintypes.DWORD()
-            kernel32.GetConsoleMode(stdout_handle, ctypes.byref(mode))
-            
-            # Enable virtual terminal processing (ANSI escape sequences)
-            ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
-            kernel32.SetConsoleMode(stdout_handle, mode.value | ENABLE_VIRTUAL_TERMINAL_PROCESSING)
-        except Exception:
+        fd = _stream_fd(stream)
+        enabled: Optional[bool] = False
+        if fd is not None:
+            enabled = _WIN_ANSI_ENABLED.get(fd)
+            if enabled is None:
+                with _COLOR_LOCK:
+                    enabled = _WIN_ANSI_ENABLED.get(fd)
+                    if enabled is None:
+                        enabled = _WIN_ANSI_ENABLED[fd] = _enable_windows_ansi(fd)
+        if not enabled:
             # If we can't enable ANSI support, disable colors
             self.use_colors = False
     
@@ -111,116 +258,909 @@ class ColoredFormatter(logging.Formatter):
         """
         Format the log record with colors if enabled.
         """
-        if not self.use_colors:
-            return super().format(record)
-        
-        # Get the color for this log level
-        level_color = self.COLORS.get(record.levelname, '')
-        
-        # Format the message normally first
-        formatted_message = super().format(record)
-        
-        # Add color codes around the entire message
-        if level_color:
-            formatted_message = f"{level_color}{formatted_message}{self.RESET}"
-        
-        return formatted_message
+        message = super().format(record)
+        wrap = self._wraps.get(record.levelno)
+        if wrap is None:
+            return message
+        return "".join((wrap[0], message, wrap[1]))
+
+
+# Used to render tracebacks before records are queued
+_EXC_FORMATTER = logging.Formatter()
+
+# Most records the listener takes off the queue per wake-up
+_MAX_BATCH = 256
+
+# Argument types that pickle cheaply and format the same in any process
+_PICKLE_SAFE_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def _args_pickle_safe(msg: Any, args: Any) -> bool:
+    """Whether a record's msg and args can be sent unformatted to another process."""
+    if type(msg) is not str:
+        return False
+    if isinstance(args, tuple):
+        return all(type(arg) in _PICKLE_SAFE_TYPES for arg in args)
+    if isinstance(args, dict):
+        return all(type(arg) in _PICKLE_SAFE_TYPES for arg in args.values())
+    return args is None
+
+
+# Most handled records kept for reuse when record pooling is enabled
+_POOL_SIZE = 256
+
+
+class _PooledRecord(logging.LogRecord):
+    """A record handed out by ``make_record``; only these are ever recycled."""
+
+
+def _recycle_records(pool: "Deque[logging.LogRecord]", records: List[logging.LogRecord]) -> None:
+    """Empty handled records that came from the pool and return them to it."""
+    for record in records:
+        if type(record) is _PooledRecord:
+            record.__dict__.clear()
+            pool.append(record)
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """
+    A queue listener that only relies on blocking ``get``/``put``, so it also
+    works with ``multiprocessing.SimpleQueue``.
+    """
+    
+    # queue.SimpleQueue or multiprocessing.Queue/SimpleQueue
+    queue: Any
+    
+    # As in QueueListener, which typeshed does not declare
+    _sentinel: Any = None
+    
+    # Set by the owning handler when handled records are reused
+    record_pool: Optional["Deque[logging.LogRecord]"] = None
+    
+    def dequeue(self, block: bool) -> Any:
+        """Block until the next record is available."""
+        return self.queue.get()
+    
+    def enqueue_sentinel(self) -> None:
+        """Put the sentinel that stops the listener thread."""
+        self.queue.put(self._sentinel)
+    
+    def _monitor(self) -> None:
+        """Park on the queue and handle records in batches until the sentinel arrives."""
+        # Nothing joins on this queue, so skip the per-record task_done()
+        q_get = self.queue.get
+        sentinel = self._sentinel
+        while True:
+            record = q_get()
+            if record is sentinel:
+                break
+            # Drain whatever else is already waiting and handle it together
+            batch = [record]
+            stop = self._drain(batch)
+            self.handle_batch(batch)
+            if stop:
+                break
+    
+    def _drain(self, batch: List[logging.LogRecord]) -> bool:
+        """Move queued records into batch without blocking; True if the sentinel was seen."""
+        q = self.queue
+        sentinel = self._sentinel
+        get_nowait = getattr(q, 'get_nowait', None)
+        while len(batch) < _MAX_BATCH:
+            if get_nowait is not None:
+                try:
+                    record = get_nowait()
+                except queue.Empty:
+                    break
+            elif not q.empty():
+                # multiprocessing.SimpleQueue has no get_nowait
+                record = q.get()
+            else:
+                break
+            if record is sentinel:
+                return True
+            batch.append(record)
+        return False
+    
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """Hand a batch of records to each handler, as a list where supported."""
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                batch = [r for r in records if r.levelno >= handler.level]
+            else:
+                batch = records
+            if not batch:
+                continue
+            handle_batch = getattr(handler, 'handle_batch', None)
+            if handle_batch is not None:
+                handle_batch(batch)
+            else:
+                self._handle_locked(handler, batch)
+        if self.record_pool is not None:
+            _recycle_records(self.record_pool, records)
+    
+    @staticmethod
+    def _handle_locked(handler: logging.Handler, records: List[logging.LogRecord]) -> None:
+        """Filter and emit records through a plain handler, taking its lock once."""
+        handler.acquire()
+        try:
+            if not handler.filters:
+                for record in records:
+                    handler.emit(record)
+                return
+            for record in records:
+                rv: Union[bool, logging.LogRecord] = handler.filter(record)
+                if not rv:
+                    continue
+                if isinstance(rv, logging.LogRecord):
+                    # Filters may return a replacement record (Python 3.12+)
+                    record = rv
+                handler.emit(record)
+        finally:
+            handler.release()
+
+
+# Live queue handlers, stopped by a single exit hook so pending records are written
+_ALL_HANDLERS: "weakref.WeakSet[MultiprocessingHandler]" = weakref.WeakSet()
+
+
+def _shutdown_all() -> None:
+    """Stop every live multiprocessing handler's listener thread and write out buffers."""
+    for handler in list(_ALL_HANDLERS):
+        handler.stop()
+    for buffered in list(_BUFFERED_HANDLERS):
+        try:
+            buffered.flush()
+        except Exception:
+            pass
+
+
+atexit.register(_shutdown_all)
+
+
+# Handlers that buffer in memory, so a forked child can drop the parent's buffers
+_BUFFERED_HANDLERS: "weakref.WeakSet[logging.Handler]" = weakref.WeakSet()
+
+
+class _IdleFlusher:
+    """
+    A single daemon thread that flushes buffered handlers whose records have
+    waited ``flush_interval`` seconds, instead of a timer thread per flush.
+    """
+    
+    def __init__(self) -> None:
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Start over without a thread or pending flushes (also used after a fork)."""
+        self._cond = threading.Condition(threading.Lock())
+        self._pending: Dict[logging.Handler, float] = {}
+        self._thread: Optional[threading.Thread] = None
+    
+    def schedule(self, handler: logging.Handler, delay: float) -> None:
+        """Flush handler after delay seconds unless it is flushed before then."""
+        with self._cond:
+            if handler in self._pending:
+                return
+            self._pending[handler] = time.monotonic() + delay
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="jmtlogger-flusher", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+    
+    def cancel(self, handler: logging.Handler) -> None:
+        """Forget a scheduled flush of handler."""
+        with self._cond:
+            self._pending.pop(handler, None)
+    
+    def _run(self) -> None:
+        """Sleep until the earliest deadline and flush the handlers that are due."""
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [h for h, deadline in self._pending.items() if deadline <= now]
+                    if due:
+                        for handler in due:
+                            del self._pending[handler]
+                        break
+                    timeout = min(self._pending.values()) - now if self._pending else None
+                    self._cond.wait(timeout)
+            for handler in due:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+
+
+_IDLE_FLUSHER = _IdleFlusher()
+
+
+def _reset_buffers_after_fork() -> None:
+    """Discard records buffered by the parent; the parent writes them itself."""
+    _IDLE_FLUSHER._reset()
+    for handler in list(_BUFFERED_HANDLERS):
+        handler._reset_buffer()  # type: ignore[attr-defined]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_buffers_after_fork)
+
+
+def _shutdown_at_process_exit(_: object) -> None:
+    """
+    Run ``_shutdown_all`` when a multiprocessing child exits; forked children
+    leave through ``os._exit``, which skips atexit hooks.
+    """
+    # Above the exit priority of multiprocessing.Queue's feeder thread, which
+    # must still be running while listeners drain a shared queue
+    multiprocessing.util.Finalize(None, _shutdown_all, exitpriority=20)
+
 
+# Registered per child process, after multiprocessing clears the parent's finalizers
+multiprocessing.util.register_after_fork(_IDLE_FLUSHER, _shutdown_at_process_exit)
 
-class MultiprocessingHandler(logging.Handler):
+
+class MultiprocessingHandler(logging.handlers.QueueHandler):
     """
     A handler that safely handles logging from multiple processes.
     
-    This handler uses a queue to collect log records from multiple processes
-    and a separate thread to write them to the actual handlers.
+    This handler puts log records on a single queue and a ``QueueListener``
+    thread writes them to the actual handlers. An in-process
+    ``queue.SimpleQueue``, which needs no pickling or task accounting, is used
+    by default; pass a shared ``multiprocessing.Queue`` to fan records in from
+    other processes. A handler created without target handlers only forwards
+    records to the queue, which is how child processes attach to the parent.
+    
+    Shared queues may be a ``multiprocessing.Queue`` or the lighter
+    ``multiprocessing.SimpleQueue``, which has no feeder thread.
+    
+    The in-process queue holds at most ``queue_size`` records, as does a
+    shared ``multiprocessing.Queue`` created with that ``maxsize``. When a
+    slow handler lets the in-process queue fill up, the oldest record is
+    dropped so the producer never blocks or grows memory; a full shared queue
+    belongs to another process's listener, so the new record is dropped
+    instead. Either way ``dropped_count`` is bumped.
+    
+    With ``pool_records``, records made by ``make_record`` are emptied once
+    they are dispatched in this process and reused instead of allocating a
+    new ``LogRecord`` per call. Callers must only take pooled records when
+    this handler is the only one to see them, and target handlers must not
+    keep references to the records they handle; the built-in console and
+    file handlers do not.
+    
+    In direct mode there is no queue or listener thread at all, and records
+    are passed straight to the actual handlers. With a ``buffer_capacity``
+    above 1 they are instead held in memory, like
+    ``logging.handlers.MemoryHandler``, and passed on as one batch once that
+    many records are held, ``flush_interval`` seconds have passed, or an
+    ERROR (or higher) arrives.
     """
     
-    def __init__(self, handler: logging.Handler) -> None:
+    # queue.SimpleQueue or multiprocessing.Queue/SimpleQueue
+    queue: Any
+    
+    def __init__(self, *handlers: logging.Handler, mp_queue: Optional[Any] = None,
+                 direct: bool = False, buffer_capacity: int = 1,
+                 flush_interval: float = 1.0, queue_size: int = 0,
+                 pool_records: bool = False, format_async: bool = True) -> None:
         """
         Initialize the multiprocessing handler.
         
         Args:
-            handler: The actual handler to write log records to
+            *handlers: The actual handlers to write log records to
+            mp_queue: Shared multiprocessing queue, or None for an in-process queue
+            direct: Dispatch records to the handlers without a queue
+            buffer_capacity: Records held in direct mode before they are dispatched
+            flush_interval: Max seconds a record is held in direct mode
+            queue_size: Max records in the in-process queue, or 0 for no limit
+            pool_records: Reuse dispatched records (in-process queues and direct mode only)
+            format_async: Leave formatting of simple args on a shared queue to the consumer
         """
-        super().__init__()
-        self._handler = handler
-        self._queue: multiprocessing.Queue = multiprocessing.Queue()
-        self._thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
-        self.start()
+        log_queue: Any
+        if direct:
+            log_queue = None
+        elif mp_queue is not None:
+            log_queue = mp_queue
+        else:
+            log_queue = queue.SimpleQueue()
+        super().__init__(log_queue)
+        self._handlers = handlers
+        self._cross_process = mp_queue is not None
+        self._direct = direct and bool(handlers)
+        self._pid = os.getpid()
+        # Records below every target handler's level are dropped up front
+        self._min_level = min((h.level for h in handlers), default=logging.NOTSET)
+        self._emit_level = max(self.level, self._min_level)
+        self.buffer_capacity = buffer_capacity
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.format_async = format_async
+        self.dropped_count = 0
+        self._dropped_lock = threading.Lock()
+        self._buffer: List[logging.LogRecord] = []
+        self._last_flush = time.monotonic()
+        self._flush_scheduled = False
+        # Pickled records leave the process, so only in-process records are reused
+        self._record_pool: Optional[Deque[logging.LogRecord]] = None
+        if pool_records and handlers and not self._cross_process:
+            self._record_pool = collections.deque(maxlen=_POOL_SIZE)
+        self._listener: Optional[_QueueListener] = None
+        if handlers:
+            self._listener = _QueueListener(
+                self.queue, *handlers, respect_handler_level=True
+            )
+            self._listener.record_pool = self._record_pool
+            if self._direct:
+                _ALL_HANDLERS.add(self)
+                _BUFFERED_HANDLERS.add(self)
+            else:
+                self.start()
         
     def start(self) -> None:
-        """Start the logging thread."""
-        if self._thread is None or not self._thread.is_alive():
-            self._stop_event.clear()
-            self._thread = threading.Thread(target=self._worker, daemon=True)
-            self._thread.start()
-            atexit.register(self.stop)
+        """Start the listener thread."""
+        if self._direct:
+            return
+        if self._listener is not None and self._listener._thread is None:
+            self._listener.start()
+            _ALL_HANDLERS.add(self)
     
     def stop(self) -> None:
-        """Stop the logging thread."""
-        if self._thread and self._thread.is_alive():
-            self._stop_event.set()
-            # Send sentinel to wake up the worker
-            try:
-                self._queue.put_nowait(None)
-            except:
-                pass
-            self._thread.join(timeout=1.0)
+        """Stop the listener thread after it has drained the queue."""
+        if self._pid != os.getpid():
+            # A forked child inherited the listener but does not run it; the
+            # sentinel would stop the parent's listener on a shared queue
+            return
+        if self._direct:
+            self.flush()
+        elif self._listener is not None and self._listener._thread is not None:
+            self._listener.stop()
+    
+    def flush(self) -> None:
+        """Dispatch records held in direct mode to the actual handlers."""
+        self.acquire()
+        try:
+            if self._flush_scheduled:
+                _IDLE_FLUSHER.cancel(self)
+                self._flush_scheduled = False
+            if self._buffer and self._listener is not None:
+                records = self._buffer
+                self._buffer = []
+                self._listener.handle_batch(records)
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
     
-    def _worker(self) -> None:
-        """Worker thread that processes log records from the queue."""
-        while not self._stop_event.is_set():
+    def _reset_buffer(self) -> None:
+        """Forget held records and scheduled flushes after a fork."""
+        self._buffer = []
+        self._flush_scheduled = False
+
+    def set_targets(self, *handlers: logging.Handler) -> None:
+        """
+        Replace the actual handlers, closing those that are no longer used.
+        
+        Pending records are written to the old handlers first.
+        """
+        self.stop()
+        old_handlers = self._handlers
+        self._handlers = handlers
+        self._min_level = min((h.level for h in handlers), default=logging.NOTSET)
+        self._emit_level = max(self.level, self._min_level)
+        if self._listener is not None:
+            self._listener.handlers = handlers
+        self.start()
+        for handler in old_handlers:
+            if handler not in handlers:
+                handler.close()
+    
+    @property
+    def pools_records(self) -> bool:
+        """Whether ``make_record`` reuses records this handler has dispatched."""
+        return self._record_pool is not None
+    
+    def make_record(self, name: str, level: int, fn: str, lno: int, msg: Any,
+                    args: Any, exc_info: Any, func: Optional[str] = None,
+                    extra: Optional[Mapping[str, Any]] = None,
+                    sinfo: Optional[str] = None) -> logging.LogRecord:
+        """
+        A ``Logger.makeRecord`` replacement that takes records from the pool.
+        
+        Falls back to a new ``LogRecord`` when the pool is empty.
+        """
+        record = None
+        if self._record_pool is not None:
             try:
-                record = self._queue.get(timeout=0.1)
-                if record is None:  # Sentinel value to stop
-                    break
-                self._handler.emit(record)
-            except queue.Empty:
-                continue
-            except Exception:
-                # Ignore errors in the worker thread to prevent deadlocks
+                record = self._record_pool.pop()
+            except IndexError:
                 pass
+        if record is None:
+            record = _PooledRecord.__new__(_PooledRecord)
+        logging.LogRecord.__init__(record, name, level, fn, lno, msg, args,
+                                   exc_info, func, sinfo)
+        if extra is not None:
+            for key in extra:
+                if (key in ["message", "asctime"]) or (key in record.__dict__):
+                    raise KeyError("Attempt to overwrite %r in LogRecord" % key)
+                record.__dict__[key] = extra[key]
+        return record
+    
+    def handle(self, record: logging.LogRecord) -> bool:
+        """
+        Check the level before any filters, and skip filtering without filters.
+        """
+        if record.levelno < self._emit_level:
+            return False
+        if self.filters:
+            return super().handle(record)
+        self.acquire()
+        try:
+            self.emit(record)
+        finally:
+            self.release()
+        return True
+    
+    def setLevel(self, level: Any) -> None:
+        """Set the handler level and the threshold checked first in ``emit``."""
+        super().setLevel(level)
+        self._emit_level = max(self.level, self._min_level)
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, dropping the oldest one if it is full."""
+        q = self.queue
+        if not self._cross_process:
+            if 0 < self.queue_size <= q.qsize():
+                self._drop_oldest()
+            q.put(record)
+            return
+        put_nowait = getattr(q, 'put_nowait', None)
+        if put_nowait is None:
+            # multiprocessing.SimpleQueue is unbounded and has no put_nowait
+            q.put(record)
+            return
+        try:
+            put_nowait(record)
+        except queue.Full:
+            # Only the owning process takes records off a shared queue, or a
+            # producer could also take its listener's stop sentinel
+            self._count_dropped()
+    
+    def _drop_oldest(self) -> None:
+        """Discard the record at the head of the in-process queue, if there still is one."""
+        q = self.queue
+        try:
+            record = q.get_nowait()
+        except queue.Empty:
+            return
+        if record is None:
+            # The listener's stop sentinel (None) is never dropped
+            q.put_nowait(record)
+            return
+        self._count_dropped()
+    
+    def _count_dropped(self) -> None:
+        """Count a dropped record; producers in several threads may drop at once."""
+        with self._dropped_lock:
+            self.dropped_count += 1
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare a record for queuing.
+        
+        Records that stay in this process are queued untouched, so tracebacks
+        are formatted by the listener thread rather than the caller.
+        """
+        if self._cross_process:
+            return self._prepare_for_pickle(record)
+        return record
+    
+    def _prepare_for_pickle(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Reduce a record to what can cross a process boundary."""
+        # Args of simple types travel as they are and are formatted by the
+        # consumer; anything else is rendered here so only strings are
+        # pickled, as are tracebacks
+        if not (self.format_async and _args_pickle_safe(record.msg, record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
     
     def emit(self, record: logging.LogRecord) -> None:
         """Emit a log record by putting it in the queue."""
+        # Records below this handler's level or every target's level need no work;
+        # handle() does not check the level for callers bypassing the logger
+        if record.levelno < self._emit_level:
+            return
+        if self._listener is not None and not self._cross_process:
+            if self._pid != os.getpid():
+                # A forked child inherited this handler but not the listener
+                # thread (or the parent's buffers), so write through the
+                # target handlers and flush before the child can exit
+                self._listener.handle(record)
+                for handler in self._handlers:
+                    handler.flush()
+                return
+            if self._direct:
+                self._buffer.append(record)
+                if (len(self._buffer) >= self.buffer_capacity
+                        or record.levelno >= logging.ERROR
+                        or time.monotonic() - self._last_flush >= self.flush_interval):
+                    self.flush()
+                elif not self._flush_scheduled:
+                    # Make sure held records are dispatched within flush_interval
+                    self._flush_scheduled = True
+                    _IDLE_FLUSHER.schedule(self, self.flush_interval)
+                return
         try:
-            # Format exception info if present to make record picklable
-            if record.exc_info:
-                record.exc_text = self.format(record)
-                record.exc_info = None
-            record.stack_info = None
-            self._queue.put_nowait(record)
-        except:
-            # If queue is full, drop the record to prevent blocking
-            pass
+            # In-process records are shared by reference and queued as they are
+            if self._cross_process:
+                record = self._prepare_for_pickle(record)
+            self.enqueue(record)
+        except Exception:
+            self.handleError(record)
     
     def close(self) -> None:
         """Close the handler and clean up resources."""
         self.stop()
-        self._handler.close()
+        for handler in self._handlers:
+            handler.close()
         super().close()
 
 
+def _try_lock_file(fd: int) -> bool:
+    """Take an exclusive OS lock on an open file; False if another holder has it."""
+    try:
+        if sys.platform == 'win32':
+            # msvcrt locks a byte range from the current position; always lock byte 0
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _lock_file(fd: int) -> None:
+    """Take an exclusive OS lock on an open file, waiting for other holders."""
+    if sys.platform == 'win32':
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                # LK_LOCK retries for about ten seconds before giving up
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock_file(fd: int) -> None:
+    """Release the lock taken by ``_try_lock_file`` or ``_lock_file``."""
+    if sys.platform == 'win32':
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+# Log file path -> the handler in this process that buffered records for it
+# last; another handler flushes that one first, so loggers sharing a file
+# keep their records in order
+_FILE_WRITERS: Dict[str, "SafeRotatingFileHandler"] = {}
+
+
 class SafeRotatingFileHandler(logging.handlers.RotatingFileHandler):
     """
     A rotating file handler that's safe for multiprocessing.
     
-    This handler uses file locking to ensure that only one process
-    can write to the log file at a time.
+    The file is opened for appending, so on POSIX each batch is written with
+    an ``os.write`` that the OS appends atomically without any locking, and
+    only rotation takes an OS lock (``fcntl.flock``) on a ``.lock`` file next
+    to the log, so that a single process rotates even when every process
+    opens the file with its own handler. On Windows, where an append is a
+    seek followed by a write, writes take the same lock (``msvcrt.locking``)
+    as well.
+    
+    Records are formatted and encoded as they arrive, buffered in memory and
+    written with a single write once the buffer reaches ``flush_threshold``
+    bytes, ``flush_interval``
+    seconds have passed, or an ERROR (or higher) record arrives.
     """
     
+    # (st_ino, st_dev) of the open stream, to notice rotation by other processes
+    _stream_id: Optional[Tuple[int, int]] = None
+    
+    # Between stat calls the size is estimated from this process's own writes;
+    # the file is stat'ed again after this many flushes or seconds, or as soon
+    # as the estimate says the next write would rotate
+    rotation_check_interval = 128
+    rotation_check_age = 1.0
+    
     def __init__(self, filename: Path, mode: str = 'a', maxBytes: int = 0,
                  backupCount: int = 0, encoding: Optional[str] = None,
-                 delay: bool = False) -> None:
+                 delay: bool = False, flush_threshold: int = 64 * 1024,
+                 flush_interval: float = 1.0) -> None:
         """Initialize the safe rotating file handler."""
         super().__init__(str(filename), mode, maxBytes, backupCount, encoding, delay)
-        self._lock = multiprocessing.Lock()
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        # Records are encoded as they are buffered, the way the text stream would
+        encoding = self.encoding
+        if encoding is None or encoding == 'locale':
+            encoding = locale.getpreferredencoding(False)
+        self._encoding = encoding
+        self._errors = getattr(self, 'errors', None) or 'strict'
+        self._buffer: List[bytes] = []
+        self._buffer_size = 0
+        self._last_flush = time.monotonic()
+        self._flush_scheduled = False
+        self._lock_fd: Optional[int] = None
+        self._lock_pid = 0
+        self._known_size: Optional[int] = None
+        self._flushes_since_check = 0
+        self._last_check = 0.0
+        _BUFFERED_HANDLERS.add(self)
+    
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and emit a record without holding the handler lock."""
+        rv: Union[bool, logging.LogRecord] = self.filter(record) if self.filters else True
+        if rv:
+            if isinstance(rv, logging.LogRecord):
+                record = rv
+            self.emit(record)
+        return bool(rv)
     
     def emit(self, record: logging.LogRecord) -> None:
-        """Emit a log record with file locking."""
-        with self._lock:
-            super().emit(record)
+        """Format a record, then buffer it and write the buffer when due."""
+        try:
+            # Formatting is the expensive part and only touches the record,
+            # so it runs before the lock; the lock just guards the buffer
+            msg = self._encode(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        self._take_turn()
+        self.acquire()
+        try:
+            self._buffer.append(msg)
+            self._buffer_size += len(msg)
+            self._flush_if_due(record.levelno)
+        except Exception:
+            self.handleError(record)
+        finally:
+            self.release()
+    
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """Format several records, then buffer them and decide once whether to write."""
+        messages = []
+        max_level = logging.NOTSET
+        has_filters = bool(self.filters)
+        for record in records:
+            if has_filters and not self.filter(record):
+                continue
+            try:
+                messages.append(self._encode(self.format(record) + self.terminator))
+            except Exception:
+                self.handleError(record)
+                continue
+            if record.levelno > max_level:
+                max_level = record.levelno
+        if not messages:
+            return
+        self._take_turn()
+        self.acquire()
+        try:
+            self._buffer.extend(messages)
+            self._buffer_size += sum(map(len, messages))
+            self._flush_if_due(max_level)
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+    
+    def _take_turn(self) -> None:
+        """Write out another handler's buffer for the same file before buffering here."""
+        last = _FILE_WRITERS.get(self.baseFilename)
+        if last is not self:
+            _FILE_WRITERS[self.baseFilename] = self
+            if last is not None:
+                last.flush()
+    
+    def _encode(self, msg: str) -> bytes:
+        """Encode a formatted record, so a record that cannot be encoded fails alone."""
+        if os.linesep != '\n':
+            # Bytes bypass the text layer's newline translation
+            msg = msg.replace('\n', os.linesep)
+        return msg.encode(self._encoding, self._errors)
+    
+    def _reset_buffer(self) -> None:
+        """Forget buffered records and scheduled flushes after a fork."""
+        self._known_size = None
+        self._buffer.clear()
+        self._buffer_size = 0
+        self._flush_scheduled = False
+    
+    def _flush_if_due(self, levelno: int) -> None:
+        """Write the buffer if it is full, stale or holds an error."""
+        if not self._buffer:
+            return
+        if (levelno >= logging.ERROR
+                or self._buffer_size >= self.flush_threshold
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+        elif not self._flush_scheduled:
+            # Make sure an idle buffer is still written within flush_interval
+            self._flush_scheduled = True
+            _IDLE_FLUSHER.schedule(self, self.flush_interval)
+    
+    def _open(self) -> Any:
+        """Open the log file and remember which file it is."""
+        stream = super()._open()
+        opened = os.fstat(stream.fileno())
+        self._stream_id = (opened.st_ino, opened.st_dev)
+        return stream
+    
+    def _reopen(self) -> Any:
+        """Open the file at ``baseFilename`` afresh and return the new stream."""
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+        return self.stream
+    
+    def _current_size(self) -> int:
+        """
+        Size of the log file on disk, reopening the stream first if another
+        process rotated the file away from under it.
+        
+        A single ``stat`` covers both checks in the common case.
+        """
+        if self.stream is not None:
+            try:
+                on_disk = os.stat(self.baseFilename)
+            except FileNotFoundError:
+                pass
+            else:
+                if (on_disk.st_ino, on_disk.st_dev) == self._stream_id:
+                    return on_disk.st_size
+        return os.fstat(self._reopen().fileno()).st_size
+    
+    def _probe_size(self, pending: int) -> int:
+        """The file size, from ``stat`` when a check is due or else estimated."""
+        self._flushes_since_check += 1
+        known = self._known_size
+        if (known is None
+                or self._should_rotate(known, pending)
+                or self._flushes_since_check >= self.rotation_check_interval
+                or time.monotonic() - self._last_check >= self.rotation_check_age):
+            known = self._current_size()
+            self._flushes_since_check = 0
+            self._last_check = time.monotonic()
+        return known
+    
+    def _should_rotate(self, size: int, pending: int) -> bool:
+        """Whether writing pending more bytes to a file of size would exceed ``maxBytes``."""
+        return 0 < self.maxBytes <= size + pending and size > 0
+    
+    def _rotate(self, pending: int) -> None:
+        """
+        Roll the file over under the lock file, unless another process is
+        rotating or just did.
+        
+        A process that finds the lock taken does not wait: it keeps appending
+        to its current file and picks up the new one on its next write.
+        """
+        lock_fd = self._open_lock_file()
+        if not _try_lock_file(lock_fd):
+            return
+        try:
+            if self._should_rotate(self._current_size(), pending):
+                self.doRollover()
+        finally:
+            _unlock_file(lock_fd)
+    
+    def _open_lock_file(self) -> int:
+        """The descriptor of the ``.lock`` file next to the log, opened once per process."""
+        if self._lock_fd is None or self._lock_pid != os.getpid():
+            # A forked child must not share the parent's lock file description
+            self._lock_fd = os.open(self.baseFilename + '.lock', os.O_RDWR | os.O_CREAT)
+            self._lock_pid = os.getpid()
+        return self._lock_fd
+    
+    def _lock_for_write(self) -> Optional[int]:
+        """
+        Take the lock file for a write on Windows and return its descriptor.
+        
+        POSIX ``O_APPEND`` writes are atomic, so they are not locked (None);
+        the Windows CRT seeks to the end and then writes, so there the lock
+        keeps other processes from writing in between.
+        """
+        if sys.platform == 'win32':
+            lock_fd = self._open_lock_file()
+            _lock_file(lock_fd)
+            return lock_fd
+        else:
+            return None
+    
+    def rotate(self, source: str, dest: str) -> None:
+        """Rename source to dest, replacing dest atomically on every platform."""
+        if callable(self.rotator):
+            super().rotate(source, dest)
+        elif os.path.exists(source):
+            os.replace(source, dest)
+    
+    def flush(self) -> None:
+        """
+        Write any buffered records to the file, locking only to rotate (and,
+        on Windows, to write).
+        
+        A failed write is reported through ``handleError`` and what was not
+        written stays buffered for the next flush.
+        """
+        self.acquire()
+        try:
+            if self._flush_scheduled:
+                _IDLE_FLUSHER.cancel(self)
+                self._flush_scheduled = False
+            
+            if self._buffer:
+                data = b''.join(self._buffer)
+                view = memoryview(data)
+                try:
+                    # Check for rollover once per batch rather than per record,
+                    # against the size on disk since other processes append too
+                    size = self._probe_size(len(data))
+                    if self._should_rotate(size, len(data)):
+                        self._rotate(len(data))
+                        # Whoever rotated, the next flush needs the real size again
+                        self._known_size = None
+                    else:
+                        self._known_size = size + len(data)
+                    # O_APPEND writes, repeated only for short writes
+                    fd = (self.stream or self._reopen()).fileno()
+                    lock_fd = self._lock_for_write()
+                    try:
+                        while view:
+                            view = view[os.write(fd, view):]
+                    finally:
+                        if lock_fd is not None:
+                            _unlock_file(lock_fd)
+                except Exception:
+                    self._known_size = None
+                    self.handleError(logging.makeLogRecord({
+                        'msg': 'Failed to write %d buffered bytes to %s',
+                        'args': (len(view), self.baseFilename),
+                    }))
+                # Only drop what reached the file
+                self._buffer[:] = [bytes(view)] if view else []
+                self._buffer_size = len(view)
+            
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+    
+    def close(self) -> None:
+        """Write any buffered records and close the log and lock files."""
+        self.acquire()
+        try:
+            self.flush()
+            # Whatever could not be written by now is lost with the handler
+            self._buffer.clear()
+            self._buffer_size = 0
+        finally:
+            self.release()
+        if _FILE_WRITERS.get(self.baseFilename) is self:
+            _FILE_WRITERS.pop(self.baseFilename, None)
+        super().close()
+        if self._lock_fd is not None and self._lock_pid == os.getpid():
+            os.close(self._lock_fd)
+        self._lock_fd = None
 
 
 def create_console_handler(formatter: logging.Formatter, use_colors: bool = True) -> logging.Handler:
@@ -235,36 +1175,86 @@ def create_console_handler(formatter: logging.Formatter, use_colors: bool = True
     
     # If colors are requested and we have a regular formatter, wrap it with colors
     if use_colors and not isinstance(formatter, ColoredFormatter):
-        # Create a colored formatter with the same format string
+        # Create a colored formatter with the same format string; support is
+        # detected for the handler's own stream so redirected output is not wrapped
         colored_formatter = ColoredFormatter(
             fmt=formatter._fmt,
             datefmt=formatter.datefmt,
-            use_colors=True
+            use_colors=None,
+            stream=handler.stream
         )
-        handler.setFormatter(colored_formatter)
+        # Without color support the override would only add a call per record
+        handler.setFormatter(colored_formatter if colored_formatter.use_colors else formatter)
     else:
         handler.setFormatter(formatter)
     
     return handler
 
 
+# Log directories already created by this process, so each is made only once
+_CREATED_DIRS: Set[Path] = set()
+_CREATED_DIRS_LOCK = threading.Lock()
+
+
+def _ensure_log_dir(log_file: Path) -> None:
+    """Create the directory of a log file if this process has not done so yet."""
+    log_dir = Path(log_file).parent
+    with _CREATED_DIRS_LOCK:
+        if log_dir in _CREATED_DIRS:
+            return
+        log_dir.mkdir(parents=True, exist_ok=True)
+        _CREATED_DIRS.add(log_dir)
+
+
 def create_file_handler(
     log_file: Path,
     formatter: logging.Formatter,
     max_file_size: int = 10 * 1024 * 1024,
-    backup_count: int = 5
+    backup_count: int = 5,
+    flush_threshold: int = 64 * 1024,
+    flush_interval: float = 1.0
 ) -> logging.Handler:
     """Create a rotating file handler with the specified formatter."""
+    _ensure_log_dir(log_file)
     handler = SafeRotatingFileHandler(
         log_file,
         maxBytes=max_file_size,
         backupCount=backup_count,
-        encoding='utf-8'
+        encoding='utf-8',
+        flush_threshold=flush_threshold,
+        flush_interval=flush_interval
     )
     handler.setFormatter(formatter)
     return handler
 
 
-def create_multiprocessing_handler(base_handler: logging.Handler) -> MultiprocessingHandler:
-    """Create a multiprocessing-safe wrapper around a base handler."""
-    return MultiprocessingHandler(base_handler)
+def create_multiprocessing_handler(
+    *handlers: logging.Handler,
+    mp_queue: Optional[Any] = None,
+    buffer_capacity: int = 1,
+    flush_interval: float = 1.0,
+    queue_size: int = 10000,
+    pool_records: bool = False,
+    format_async: bool = True
+) -> MultiprocessingHandler:
+    """
+    Create a multiprocessing-safe wrapper around one or more base handlers.
+    
+    When there is no shared queue and this is the only process, records are
+    dispatched directly; there is no other process to hand them off to.
+    """
+    direct = (
+        mp_queue is None
+        and multiprocessing.parent_process() is None
+        and not multiprocessing.active_children()
+    )
+    return MultiprocessingHandler(
+        *handlers,
+        mp_queue=mp_queue,
+        direct=direct,
+        buffer_capacity=buffer_capacity,
+        flush_interval=flush_interval,
+        queue_size=queue_size,
+        pool_records=pool_records,
+        format_async=format_async
+    )
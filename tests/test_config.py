@@ -4,6 +4,7 @@ Tests for configuration functionality.
 
 import tempfile
 import json
+import logging
 from pathlib import Path
 from jmtlogger import LoggerConfig
 
@@ -22,6 +23,8 @@ def test_config_serialization():
     
     # Convert to dict and back
     config_dict = original_config.to_dict()
+    assert config_dict["log_file"] == "test.log"
+    assert "log_file_str" not in config_dict
     new_config = LoggerConfig.from_dict(config_dict)
     
     # Verify all attributes match
@@ -34,6 +37,14 @@ def test_config_serialization():
     assert new_config.backup_count == original_config.backup_count
 
 
+def test_config_level_names():
+    """Test that level names are resolved case-insensitively."""
+    assert LoggerConfig(log_level="debug").log_level == logging.DEBUG
+    assert LoggerConfig(log_level="WARN").log_level == logging.WARNING
+    assert LoggerConfig(log_level="fatal").log_level == logging.CRITICAL
+    assert LoggerConfig(log_level="bogus").log_level == logging.INFO
+
+
 def test_config_file_operations():
     """Test saving and loading configuration to/from file."""
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
@@ -72,5 +83,6 @@ def test_config_file_operations():
 
 if __name__ == "__main__":
     test_config_serialization()
+    test_config_level_names()
     test_config_file_operations()
     print("Configuration tests passed!")
@@ -7,6 +7,7 @@ import tempfile
 import os
 from pathlib import Path
 from jmtlogger import JMTLogger, LoggerConfig
+from jmtlogger import core
 
 
 class TestLoggerConfig:
@@ -45,6 +46,26 @@ class TestLoggerConfig:
             )
             expected_path = Path(temp_dir) / "test.log"
             assert config.log_file == expected_path
+    
+    def test_to_dict_follows_changed_paths(self):
+        """Test that to_dict reports paths changed after initialization."""
+        config = LoggerConfig(log_to_file=True, log_file="a.log")
+        config.log_file = "b.log"
+        config.log_dir = "logs"
+        assert config.to_dict()["log_file"] == "b.log"
+        assert config.to_dict()["log_dir"] == "logs"
+    
+    def test_log_dir_created_with_file_handler(self):
+        """Test that the log directory is created by the logger, not the config."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_dir = Path(temp_dir) / "nested" / "logs"
+            config = LoggerConfig(name="mkdir_test", log_to_console=False,
+                                  log_to_file=True, log_dir=log_dir)
+            assert not log_dir.exists()
+            
+            logger = JMTLogger(name="mkdir_test", config=config)
+            assert log_dir.is_dir()
+            logger.close()
 
 
 class TestJMTLogger:
@@ -119,6 +140,278 @@ class TestJMTLogger:
         
         logger.close()
     
+    def test_level_gate_follows_set_level(self):
+        """Test that suppressed levels are skipped and set_level re-enables them."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            logger = JMTLogger(
+                name="level_gate_test",
+                log_to_console=False,
+                log_to_file=True,
+                log_file=temp_path,
+                log_level="WARNING"
+            )
+            
+            logger.info("Suppressed info")
+            logger.set_level("DEBUG")
+            logger.debug("Visible debug")
+            logger.close()
+            
+            with open(temp_path, 'r') as f:
+                content = f.read()
+                assert "Suppressed info" not in content
+                assert "Visible debug" in content
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_set_level_leaves_other_handlers(self):
+        """Test that set_level only changes the logger and its own handler."""
+        logger = JMTLogger(name="set_level_test", log_to_console=True, log_level="INFO")
+        other = logging.NullHandler()
+        other.setLevel(logging.ERROR)
+        logging.getLogger("set_level_test").addHandler(other)
+        try:
+            logger.set_level("DEBUG")
+            assert other.level == logging.ERROR
+            assert JMTLogger._REGISTRY["set_level_test"]["handler"].level == logging.DEBUG
+        finally:
+            logging.getLogger("set_level_test").removeHandler(other)
+            logger.close()
+    
+    def test_level_gate_shared_by_same_name(self):
+        """Test that loggers sharing a name follow the level of the underlying logger."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            settings = dict(log_to_console=False, log_to_file=True, log_file=temp_path)
+            first = JMTLogger(name="shared_level_test", log_level="WARNING", **settings)
+            second = JMTLogger(name="shared_level_test", log_level="DEBUG", **settings)
+            first.info("Info after second logger")
+            second.close()
+            first.close()
+            
+            with open(temp_path, 'r') as f:
+                assert "Info after second logger" in f.read()
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_log_struct(self):
+        """Test that log_struct renders fields and skips suppressed levels."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        class Field:
+            rendered = 0
+            
+            def __str__(self):
+                Field.rendered += 1
+                return "field"
+        
+        try:
+            logger = JMTLogger(
+                name="log_struct_test",
+                log_to_console=False,
+                log_to_file=True,
+                log_file=temp_path,
+                log_level="INFO"
+            )
+            
+            logger.log_struct("DEBUG", "Hidden %(value)s", value=Field())
+            assert Field.rendered == 0
+            
+            logger.log_struct(logging.INFO, "Item %(item)d is %(state)s", item=7, state="done")
+            logger.log_struct("WARNING", "No fields 100%")
+            logger.close()
+            
+            with open(temp_path, 'r') as f:
+                content = f.read()
+                assert "Item 7 is done" in content
+                assert "No fields 100%" in content
+                assert "Hidden" not in content
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_same_config_shares_handlers(self):
+        """Test that identical loggers share handlers until the last one closes."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            settings = dict(log_to_console=False, log_to_file=True, log_file=temp_path)
+            first = JMTLogger(name="shared_test", **settings)
+            second = JMTLogger(name="shared_test", **settings)
+            
+            underlying = logging.getLogger("shared_test")
+            assert len(underlying.handlers) == 1
+            
+            first.info("From first")
+            first.close()
+            first.close()
+            assert len(underlying.handlers) == 1
+            
+            second.info("From second")
+            second.close()
+            assert underlying.handlers == []
+            
+            with open(temp_path, 'r') as f:
+                content = f.read()
+                assert "From first" in content
+                assert "From second" in content
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_reconfigure_keeps_unchanged_handlers(self):
+        """Test that reusing a name only rebuilds the handlers that changed."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            first = JMTLogger(name="reconfigure_test", log_to_console=False,
+                              log_to_file=True, log_file=temp_path)
+            entry = JMTLogger._REGISTRY["reconfigure_test"]
+            handler = entry["handler"]
+            file_handler = entry["targets"]["file"]
+            
+            second = JMTLogger(name="reconfigure_test", log_to_console=True,
+                               log_to_file=True, log_file=temp_path)
+            assert entry["handler"] is handler
+            assert entry["targets"]["file"] is file_handler
+            assert entry["targets"]["console"] is not None
+            assert logging.getLogger("reconfigure_test").handlers == [handler]
+            
+            second.info("After reconfigure")
+            second.close()
+            first.close()
+            
+            with open(temp_path, 'r') as f:
+                assert "After reconfigure" in f.read()
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def test_reconfigure_follows_changed_log_file(self):
+        """Test that a config whose log_file changed gets a new file handler."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = LoggerConfig(name="moved_file_test", log_to_console=False,
+                                  log_to_file=True, log_file=Path(temp_dir) / "a.log")
+            first = JMTLogger(name="moved_file_test", config=config)
+            config.log_file = Path(temp_dir) / "b.log"
+            second = JMTLogger(name="moved_file_test", config=config)
+            second.info("After move")
+            second.close()
+            first.close()
+            
+            with open(Path(temp_dir) / "b.log", 'r') as f:
+                assert "After move" in f.read()
+    
+    def test_pooled_records_are_reused(self):
+        """Test that pool_records reuses handled records without changing output."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            logger = JMTLogger(
+                name="pool_test",
+                log_to_console=False,
+                log_to_file=True,
+                log_file=temp_path,
+                pool_records=True,
+                buffer_capacity=1
+            )
+            handler = JMTLogger._REGISTRY["pool_test"]["handler"]
+            
+            logger.info("Pooled %d", 1)
+            record = handler._record_pool[-1]
+            logger.warning("Pooled %d", 2, extra={"user": "x"})
+            assert handler._record_pool[-1] is record
+            logger.close()
+            
+            assert "makeRecord" not in logging.getLogger("pool_test").__dict__
+            with open(temp_path, 'r') as f:
+                content = f.read()
+                assert "INFO" in content and "Pooled 1" in content
+                assert "WARNING" in content and "Pooled 2" in content
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_pooled_records_with_another_handler(self):
+        """Test that records stay intact for other handlers on a pooling logger."""
+        logger = JMTLogger(name="pool_shared_test", log_to_console=True, pool_records=True)
+        collected = []
+        
+        class CollectingHandler(logging.Handler):
+            def emit(self, record):
+                collected.append(record)
+        
+        other = CollectingHandler()
+        logging.getLogger("pool_shared_test").addHandler(other)
+        try:
+            logger.info("one")
+            logger.info("two")
+        finally:
+            logging.getLogger("pool_shared_test").removeHandler(other)
+            logger.close()
+        
+        assert [record.getMessage() for record in collected] == ["one", "two"]
+    
+    def test_caller_points_past_wrappers(self):
+        """Test that file records name the calling function, not the wrapper."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            logger = JMTLogger(name="caller_test", log_to_console=False,
+                               log_to_file=True, log_file=temp_path)
+            logger.warn("Through alias")
+            logger.log_struct("INFO", "Through %(kind)s", kind="log_struct")
+            logger.close()
+            
+            with open(temp_path, 'r') as f:
+                lines = f.read().splitlines()
+            assert len(lines) == 2
+            assert all("test_caller_points_past_wrappers:" in line for line in lines)
+        
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def test_caller_skipped_when_not_formatted(self, monkeypatch):
+        """Test that the stack is not walked when no format shows the caller."""
+        lookups = []
+        find_caller = core._find_caller
+        monkeypatch.setattr(core, "_find_caller", lambda *a: lookups.append(1) or find_caller(*a))
+        
+        logger = JMTLogger(name="no_caller_test", log_to_console=True)
+        logger.info("No caller needed")
+        assert lookups == []
+        logger.info("Stack requested", stack_info=True)
+        assert lookups == [1]
+        logger.close()
+    
+    def test_stdlib_logger_left_unpatched(self):
+        """Test that code logging through logging.getLogger(name) keeps stdlib behavior."""
+        logger = JMTLogger(name="unpatched_test", log_to_console=True, pool_records=True)
+        underlying = logging.getLogger("unpatched_test")
+        
+        assert "findCaller" not in underlying.__dict__
+        assert "makeRecord" not in underlying.__dict__
+        assert underlying.findCaller()[2] == "test_stdlib_logger_left_unpatched"
+        logger.close()
+    
     def test_context_manager(self):
         """Test logger as context manager."""
         with JMTLogger(name="context_test") as logger:
@@ -143,14 +436,22 @@ class TestJMTLogger:
             except ValueError:
                 logger.exception("An exception occurred")
             
+            logger.set_level("CRITICAL")
+            try:
+                raise ValueError("Suppressed exception")
+            except ValueError:
+                logger.exception("Suppressed traceback")
+            logger.log("ERROR", "Suppressed log call")
+            
             logger.close()
             
             # Check if traceback was logged
             with open(temp_path, 'r') as f:
                 content = f.read()
-                assert "An exception occurred" in content
+                assert content.count("An exception occurred") == 1
                 assert "ValueError: Test exception" in content
                 assert "Traceback" in content
+                assert "Suppressed" not in content
         
         finally:
             if os.path.exists(temp_path):
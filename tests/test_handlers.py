@@ -0,0 +1,537 @@
+"""
+Tests for the custom handlers.
+"""
+
+import logging
+import multiprocessing
+import threading
+import tempfile
+import os
+import sys
+import time
+import pytest
+from jmtlogger import handlers
+from jmtlogger.handlers import (
+    CachedFormatter,
+    ColoredFormatter,
+    MultiprocessingHandler,
+    SafeRotatingFileHandler,
+    create_console_handler,
+)
+
+
+def make_record(level: int, message: str) -> logging.LogRecord:
+    """Create a log record for feeding handlers directly."""
+    return logging.LogRecord("handler_test", level, __file__, 0, message, None, None)
+
+
+class CaptureHandler(logging.Handler):
+    """Handler that keeps the messages it receives."""
+    
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+    
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_file_handler_buffers_until_flush():
+    """Test that records are buffered and written on ERROR or flush."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+        temp_path = temp_file.name
+    
+    try:
+        handler = SafeRotatingFileHandler(temp_path, flush_interval=60.0)
+        handler.handle(make_record(logging.INFO, "Buffered message"))
+        
+        with open(temp_path, 'r') as f:
+            assert f.read() == ""
+        
+        handler.handle(make_record(logging.ERROR, "Error message"))
+        
+        with open(temp_path, 'r') as f:
+            content = f.read()
+            assert "Buffered message\nError message\n" == content
+        
+        handler.handle(make_record(logging.INFO, "Flushed on close"))
+        handler.close()
+        
+        with open(temp_path, 'r') as f:
+            assert "Flushed on close" in f.read()
+    
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def test_file_handler_drops_only_unencodable_record():
+    """Test that a record that cannot be encoded does not take the batch with it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "encode.log")
+        handler = SafeRotatingFileHandler(log_path, encoding="utf-8", flush_interval=60.0)
+        for i in range(5):
+            handler.handle(make_record(logging.INFO, f"Good {i}"))
+        handler.handle(make_record(logging.INFO, "bad \ud800"))
+        handler.close()
+        
+        with open(log_path, 'r') as f:
+            assert f.read() == "".join(f"Good {i}\n" for i in range(5))
+
+
+def test_file_handler_keeps_buffer_after_failed_write(monkeypatch):
+    """Test that a failed write is reported and retried by the next flush."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "retry.log")
+        handler = SafeRotatingFileHandler(log_path)
+        errors = []
+        handler.handleError = errors.append
+        
+        real_write = os.write
+        
+        def failing_write(fd, data):
+            monkeypatch.setattr(os, "write", real_write)
+            raise OSError("disk full")
+        monkeypatch.setattr(os, "write", failing_write)
+        
+        handler.handle(make_record(logging.ERROR, "First"))
+        assert len(errors) == 1
+        handler.handle(make_record(logging.ERROR, "Second"))
+        handler.close()
+        
+        with open(log_path, 'r') as f:
+            assert f.read() == "First\nSecond\n"
+
+
+def test_file_handlers_sharing_a_file_keep_order():
+    """Test that records of two handlers on one file are written in logging order."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "ordered.log")
+        first = SafeRotatingFileHandler(log_path, flush_interval=60.0)
+        second = SafeRotatingFileHandler(log_path, flush_interval=60.0)
+        
+        for i in range(3):
+            first.handle(make_record(logging.INFO, f"First {i}"))
+            second.handle(make_record(logging.INFO, f"Second {i}"))
+        second.close()
+        first.close()
+        
+        with open(log_path, 'r') as f:
+            assert f.read().splitlines() == [
+                "First 0", "Second 0", "First 1", "Second 1", "First 2", "Second 2"
+            ]
+
+
+def test_file_handler_flushes_idle_buffer():
+    """Test that a buffered record is written once flush_interval has passed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "idle.log")
+        handler = SafeRotatingFileHandler(log_path, flush_interval=0.05)
+        handler.handle(make_record(logging.INFO, "Idle message"))
+        
+        deadline = time.monotonic() + 5
+        while os.path.getsize(log_path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        handler.close()
+        
+        with open(log_path, 'r') as f:
+            assert f.read() == "Idle message\n"
+
+
+def test_file_handler_rotates_per_batch():
+    """Test that the size limit is still honored with buffered writes."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "rotate.log")
+        handler = SafeRotatingFileHandler(
+            log_path, maxBytes=100, backupCount=2, flush_threshold=40
+        )
+        
+        for i in range(20):
+            handler.handle(make_record(logging.INFO, f"Message number {i:02d}"))
+        handler.close()
+        
+        assert os.path.exists(log_path + ".1")
+        assert os.path.getsize(log_path) <= 100
+
+
+def test_file_handler_follows_rotation_by_other_writer():
+    """Test that a handler reopens the file after another handler rotated it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "shared.log")
+        # Two handlers on one file stand in for two processes
+        first = SafeRotatingFileHandler(log_path, maxBytes=100, backupCount=2)
+        second = SafeRotatingFileHandler(log_path, maxBytes=100, backupCount=2)
+        # Look at the file on every flush instead of trusting the size estimate
+        second.rotation_check_age = 0
+        
+        second.handle(make_record(logging.ERROR, "Second before rotation"))
+        for i in range(10):
+            first.handle(make_record(logging.ERROR, f"First message {i:02d}"))
+        second.handle(make_record(logging.ERROR, "Second after rotation"))
+        first.close()
+        second.close()
+        
+        with open(log_path, 'r') as f:
+            assert "Second after rotation" in f.read()
+        assert os.path.getsize(log_path) <= 100
+
+
+def test_file_handler_stats_file_only_when_due():
+    """Test that the file size is estimated between periodic stat checks."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "probe.log")
+        handler = SafeRotatingFileHandler(log_path, maxBytes=1000, backupCount=1)
+        handler.rotation_check_interval = 4
+        handler.rotation_check_age = 60.0
+        checks = []
+        current_size = handler._current_size
+        handler._current_size = lambda: checks.append(1) or current_size()
+        
+        for i in range(8):
+            handler.handle(make_record(logging.ERROR, f"Line {i}"))
+        assert len(checks) == 2
+        
+        # An estimate that reaches maxBytes forces a real check, and the
+        # rotation checks once more under the lock
+        handler.handle(make_record(logging.ERROR, "x" * 1000))
+        assert len(checks) == 4
+        handler.close()
+        assert os.path.exists(log_path + ".1")
+
+
+def test_file_handler_skips_rotation_while_locked_elsewhere():
+    """Test that a handler keeps appending instead of waiting while another rotates."""
+    fcntl = pytest.importorskip("fcntl")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "locked.log")
+        handler = SafeRotatingFileHandler(log_path, maxBytes=50, backupCount=2)
+        
+        # Another process holding the rotation lock
+        lock_fd = os.open(log_path + ".lock", os.O_RDWR | os.O_CREAT)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        try:
+            for i in range(5):
+                handler.handle(make_record(logging.ERROR, f"While locked {i}"))
+            assert not os.path.exists(log_path + ".1")
+        finally:
+            os.close(lock_fd)
+        
+        handler.handle(make_record(logging.ERROR, "After unlock"))
+        handler.close()
+        
+        assert os.path.exists(log_path + ".1")
+        with open(log_path, 'r') as f:
+            assert f.read() == "After unlock\n"
+
+
+def test_file_handler_formats_outside_lock():
+    """Test that other threads can take the handler lock while a record is formatted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        handler = SafeRotatingFileHandler(os.path.join(temp_dir, "unlocked.log"))
+        lock_free = []
+        
+        class ProbingFormatter(logging.Formatter):
+            def format(self, record):
+                def probe():
+                    lock_free.append(handler.lock.acquire(blocking=False))
+                    if lock_free[-1]:
+                        handler.lock.release()
+                thread = threading.Thread(target=probe)
+                thread.start()
+                thread.join()
+                return super().format(record)
+        
+        handler.setFormatter(ProbingFormatter())
+        handler.handle(make_record(logging.INFO, "Single"))
+        handler.handle_batch([make_record(logging.INFO, "Batched")])
+        handler.close()
+        assert lock_free == [True, True]
+
+
+def test_colored_formatter_wraps_by_level():
+    """Test that colors are applied per level and skipped when disabled."""
+    colored = ColoredFormatter("%(levelname)s: %(message)s", use_colors=True)
+    plain = ColoredFormatter("%(levelname)s: %(message)s", use_colors=False)
+    
+    assert colored.format(make_record(logging.INFO, "hi")) == "\033[32mINFO: hi\033[0m"
+    assert colored.format(make_record(logging.ERROR, "oops")) == "\033[31mERROR: oops\033[0m"
+    assert colored.format(make_record(25, "custom")) == "Level 25: custom"
+    assert plain.format(make_record(logging.INFO, "hi")) == "INFO: hi"
+
+
+def test_cached_formatter_matches_stdlib_time():
+    """Test that cached timestamps match logging.Formatter within and across seconds."""
+    for datefmt in ("%Y-%m-%d %H:%M:%S", None):
+        cached = CachedFormatter("%(asctime)s %(message)s", datefmt=datefmt)
+        stdlib = logging.Formatter("%(asctime)s %(message)s", datefmt=datefmt)
+        
+        record = make_record(logging.INFO, "hi")
+        for created in (1700000000.125, 1700000000.875, 1700000001.5):
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            assert cached.format(record) == stdlib.format(record)
+
+
+def test_cached_formatter_compiles_percent_formats():
+    """Test that compiled %-style formats match logging.Formatter."""
+    fmt = "%(asctime)s %(levelname)-8s %(funcName)s:%(lineno)d %(message)s %%"
+    cached = CachedFormatter(fmt)
+    stdlib = logging.Formatter(fmt)
+    record = make_record(logging.WARNING, "hi %s")
+    record.args = ("there",)
+    assert cached.format(record) == stdlib.format(record)
+    
+    missing = CachedFormatter("%(message)s %(user)s")
+    with pytest.raises(ValueError):
+        missing.format(make_record(logging.INFO, "no user"))
+
+
+def test_cached_formatter_keeps_escaped_percent():
+    """Test that an escaped %% before a field name is not compiled as a field."""
+    record = make_record(logging.INFO, "hello")
+    for fmt in ("%%(name)s %(message)s", "%%(name)s %(levelname)s %(message)s"):
+        assert CachedFormatter(fmt).format(record) == logging.Formatter(fmt).format(record)
+
+
+def test_queue_handler_delivers_batches_in_order():
+    """Test that batch-drained records all reach the file in order."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "batch.log")
+        handler = MultiprocessingHandler(SafeRotatingFileHandler(log_path))
+        
+        for i in range(1000):
+            handler.handle(make_record(logging.INFO, f"Record {i}"))
+        handler.close()
+        
+        with open(log_path, 'r') as f:
+            lines = f.read().splitlines()
+        
+        assert lines == [f"Record {i}" for i in range(1000)]
+
+
+def test_direct_handler_holds_records_until_capacity():
+    """Test that direct mode dispatches held records on capacity, ERROR or close."""
+    capture = CaptureHandler()
+    handler = MultiprocessingHandler(
+        capture, direct=True, buffer_capacity=3, flush_interval=60.0
+    )
+    
+    handler.handle(make_record(logging.INFO, "one"))
+    handler.handle(make_record(logging.INFO, "two"))
+    assert capture.messages == []
+    
+    handler.handle(make_record(logging.INFO, "three"))
+    assert capture.messages == ["one", "two", "three"]
+    
+    handler.handle(make_record(logging.ERROR, "error"))
+    assert capture.messages[-1] == "error"
+    
+    handler.handle(make_record(logging.INFO, "held"))
+    handler.close()
+    assert capture.messages[-1] == "held"
+
+
+def test_handler_level_checked_before_queueing():
+    """Test that records below the handler's level are dropped in emit."""
+    capture = CaptureHandler()
+    handler = MultiprocessingHandler(capture, direct=True)
+    handler.setLevel(logging.WARNING)
+    
+    handler.handle(make_record(logging.INFO, "dropped"))
+    handler.handle(make_record(logging.WARNING, "kept"))
+    handler.setLevel(logging.DEBUG)
+    handler.handle(make_record(logging.DEBUG, "enabled"))
+    handler.close()
+    
+    assert capture.messages == ["kept", "enabled"]
+
+
+def test_handler_filters_only_records_above_level():
+    """Test that the handler's own filters run after the level check."""
+    capture = CaptureHandler()
+    handler = MultiprocessingHandler(capture, direct=True)
+    handler.setLevel(logging.INFO)
+    seen = []
+    handler.addFilter(lambda record: seen.append(record.levelno) or "skip" not in record.msg)
+    
+    handler.handle(make_record(logging.DEBUG, "below level"))
+    handler.handle(make_record(logging.INFO, "skip me"))
+    handler.handle(make_record(logging.INFO, "kept"))
+    handler.close()
+    
+    assert seen == [logging.INFO, logging.INFO]
+    assert capture.messages == ["kept"]
+
+
+def test_queue_handler_filters_plain_handlers_per_record():
+    """Test that batched dispatch to handlers without handle_batch applies filters."""
+    capture = CaptureHandler()
+    capture.addFilter(lambda record: "skip" not in record.getMessage())
+    handler = MultiprocessingHandler(capture)
+    
+    for message in ("first", "skip me", "second"):
+        handler.handle(make_record(logging.INFO, message))
+    handler.close()
+    
+    assert capture.messages == ["first", "second"]
+
+
+class BlockingHandler(CaptureHandler):
+    """Capture handler that blocks on its first record until released."""
+    
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release_emit = threading.Event()
+    
+    def emit(self, record):
+        self.entered.set()
+        self.release_emit.wait(5)
+        super().emit(record)
+
+
+def test_full_queue_drops_oldest_records():
+    """Test that a full in-process queue drops its oldest records and counts them."""
+    blocking = BlockingHandler()
+    handler = MultiprocessingHandler(blocking, queue_size=3)
+    
+    handler.handle(make_record(logging.INFO, "first"))
+    assert blocking.entered.wait(5)
+    for i in range(10):
+        handler.handle(make_record(logging.INFO, f"queued {i}"))
+    blocking.release_emit.set()
+    handler.close()
+    
+    assert handler.dropped_count == 7
+    assert blocking.messages == ["first", "queued 7", "queued 8", "queued 9"]
+
+
+def test_full_shared_queue_drops_new_records():
+    """Test that forwarding to a full bounded multiprocessing queue drops the new record."""
+    mp_queue = multiprocessing.Queue(maxsize=2)
+    handler = MultiprocessingHandler(mp_queue=mp_queue)
+    
+    for i in range(5):
+        handler.handle(make_record(logging.INFO, f"record {i}"))
+    
+    assert handler.dropped_count == 3
+    assert [mp_queue.get(timeout=5).getMessage() for _ in range(2)] == ["record 0", "record 1"]
+    handler.close()
+
+
+def test_full_queue_keeps_stop_sentinel():
+    """Test that dropping the oldest record never drops the listener's stop sentinel."""
+    blocking = BlockingHandler()
+    handler = MultiprocessingHandler(blocking, queue_size=1)
+    
+    handler.handle(make_record(logging.INFO, "first"))
+    assert blocking.entered.wait(5)
+    handler.queue.put(None)
+    handler.handle(make_record(logging.INFO, "after stop"))
+    blocking.release_emit.set()
+    
+    handler._listener._thread.join(5)
+    assert not handler._listener._thread.is_alive()
+    assert handler.dropped_count == 0
+    handler.close()
+
+
+def test_console_handler_skips_colors_without_support(monkeypatch):
+    """Test that the console handler keeps the plain formatter when colors are unsupported."""
+    monkeypatch.setattr(ColoredFormatter, "_supports_color", lambda self, stream: False)
+    formatter = CachedFormatter("%(message)s")
+    handler = create_console_handler(formatter, use_colors=True)
+    assert handler.formatter is formatter
+    
+    monkeypatch.setattr(ColoredFormatter, "_supports_color", lambda self, stream: True)
+    handler = create_console_handler(formatter, use_colors=True)
+    assert isinstance(handler.formatter, ColoredFormatter)
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="requires a pseudo-terminal")
+def test_console_colors_follow_handler_stream(monkeypatch):
+    """Test that colors are detected for stderr, where the console handler writes."""
+    monkeypatch.setattr(handlers, "_COLOR_SUPPORTED", {})
+    monkeypatch.setenv("TERM", "xterm")
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    monkeypatch.delenv("FORCE_COLOR", raising=False)
+    
+    master, slave = os.openpty()
+    read_end, write_end = os.pipe()
+    with os.fdopen(slave, "w") as terminal, os.fdopen(write_end, "w") as pipe:
+        formatter = CachedFormatter("%(message)s")
+        
+        # app > out.txt: stdout redirected, stderr still on the terminal
+        monkeypatch.setattr(sys, "stdout", pipe)
+        monkeypatch.setattr(sys, "stderr", terminal)
+        assert isinstance(create_console_handler(formatter).formatter, ColoredFormatter)
+        
+        # app 2> err.log: stderr redirected, stdout still on the terminal
+        monkeypatch.setattr(sys, "stdout", terminal)
+        monkeypatch.setattr(sys, "stderr", pipe)
+        assert create_console_handler(formatter).formatter is formatter
+    os.close(master)
+    os.close(read_end)
+
+
+def test_color_support_detected_once(monkeypatch):
+    """Test that color support is detected once per stream and shared by formatters."""
+    calls = []
+    monkeypatch.setattr(handlers, "_COLOR_SUPPORTED", {})
+    monkeypatch.setattr(handlers, "_detect_color_support", lambda fd: calls.append(fd) or True)
+    
+    read_end, write_end = os.pipe()
+    with os.fdopen(write_end, "w") as stream:
+        first = ColoredFormatter("%(message)s", stream=stream)
+        second = ColoredFormatter("%(message)s", stream=stream)
+    os.close(read_end)
+    
+    assert first.use_colors and second.use_colors
+    assert calls == [write_end]
+
+
+def test_in_process_queue_keeps_exc_info_and_stack_info():
+    """Test that tracebacks are left for the listener thread to format."""
+    seen = []
+    
+    class InspectHandler(logging.Handler):
+        def emit(self, record):
+            seen.append((record.exc_info is not None, record.stack_info,
+                         threading.current_thread().name))
+    
+    handler = MultiprocessingHandler(InspectHandler())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "handler_test", logging.ERROR, __file__, 0, "failed", None,
+            sys.exc_info(), sinfo="Stack (most recent call last)"
+        )
+    handler.handle(record)
+    handler.close()
+    
+    assert len(seen) == 1
+    has_exc_info, stack_info, thread_name = seen[0]
+    assert has_exc_info
+    assert stack_info == "Stack (most recent call last)"
+    assert thread_name != threading.current_thread().name
+
+
+def test_shared_queue_defers_formatting_of_simple_args():
+    """Test that only records with simple args are sent unformatted to another process."""
+    mp_queue = multiprocessing.SimpleQueue()
+    handler = MultiprocessingHandler(mp_queue=mp_queue)
+    
+    simple = make_record(logging.INFO, "Item %d is %s")
+    simple.args = (7, "done")
+    complex_args = make_record(logging.INFO, "Value %s")
+    complex_args.args = (object(),)
+    handler.handle(simple)
+    handler.handle(complex_args)
+    
+    received = [mp_queue.get(), mp_queue.get()]
+    assert received[0].args == (7, "done")
+    assert received[0].getMessage() == "Item 7 is done"
+    assert received[1].args is None
+    assert received[1].getMessage().startswith("Value <object object")
+    handler.close()
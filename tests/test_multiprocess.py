@@ -6,6 +6,7 @@ import multiprocessing
 import tempfile
 import time
 import os
+import pytest
 from pathlib import Path
 from jmtlogger import JMTLogger
 
@@ -72,7 +73,288 @@ def test_multiprocessing_logging():
             os.unlink(temp_path)
 
 
+def shared_queue_worker(worker_id: int, mp_queue, num_messages: int):
+    """Worker process that forwards its records to the parent's queue."""
+    logger = JMTLogger(name="shared_queue_worker", mp_queue=mp_queue, forward_only=True)
+    
+    for i in range(num_messages):
+        logger.info("Worker %d - Message %d", worker_id, i + 1)
+    
+    logger.close()
+
+
+@pytest.mark.parametrize("queue_factory", [multiprocessing.Queue, multiprocessing.SimpleQueue])
+def test_shared_queue_logging(queue_factory):
+    """Test that child processes can fan records in through a shared queue."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+        temp_path = temp_file.name
+    
+    try:
+        mp_queue = queue_factory()
+        logger = JMTLogger(
+            name="shared_queue_parent",
+            mp_queue=mp_queue,
+            log_to_file=True,
+            log_file=temp_path,
+            log_to_console=False
+        )
+        
+        processes = [
+            multiprocessing.Process(target=shared_queue_worker, args=(worker_id, mp_queue, 5))
+            for worker_id in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        
+        logger.info("Parent done")
+        logger.close()
+        
+        with open(temp_path, 'r') as f:
+            content = f.read()
+        
+        for worker_id in range(3):
+            assert f"Worker {worker_id} - Message 5" in content
+        assert "Parent done" in content
+    
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def queue_owner_worker(log_file: str):
+    """Worker process that owns a shared queue and its file handler."""
+    logger = JMTLogger(
+        name="queue_owner_worker",
+        mp_queue=multiprocessing.Queue(),
+        log_to_file=True,
+        log_file=log_file,
+        log_to_console=False
+    )
+    logger.info("Written by a child process that owns the queue")
+    logger.close()
+
+
+def test_shared_queue_owner_in_child_process():
+    """Test that a logger owning a shared queue writes records in a child process too."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, "owner.log")
+        process = multiprocessing.Process(target=queue_owner_worker, args=(log_file,))
+        process.start()
+        process.join(timeout=30)
+        assert process.exitcode == 0
+        
+        with open(log_file, 'r') as f:
+            assert "Written by a child process that owns the queue" in f.read()
+
+
+def inherited_logger_worker(logger: JMTLogger):
+    """Worker process that logs through a logger inherited over fork."""
+    logger.info("Message from forked child")
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method"
+)
+def test_forked_child_inherits_logger():
+    """Test that a forked child writes once and does not repeat parent buffers."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".log") as temp_file:
+        temp_path = temp_file.name
+    
+    try:
+        logger = JMTLogger(
+            name="fork_parent",
+            log_to_file=True,
+            log_file=temp_path,
+            log_to_console=False
+        )
+        logger.info("Buffered in parent")
+        
+        process = multiprocessing.get_context("fork").Process(
+            target=inherited_logger_worker, args=(logger,)
+        )
+        process.start()
+        process.join()
+        logger.close()
+        
+        with open(temp_path, 'r') as f:
+            content = f.read()
+        
+        assert content.count("Buffered in parent") == 1
+        assert content.count("Message from forked child") == 1
+    
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def closing_worker(logger: JMTLogger):
+    """Worker process that closes a logger inherited over fork."""
+    logger.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method"
+)
+def test_forked_child_close_keeps_parent_listener():
+    """Test that a forked child closing its copy of a shared-queue owner leaves the parent logging."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, "owner.log")
+        logger = JMTLogger(
+            name="fork_close_parent",
+            mp_queue=multiprocessing.Queue(),
+            log_to_file=True,
+            log_file=log_file,
+            log_to_console=False
+        )
+        
+        process = multiprocessing.get_context("fork").Process(
+            target=closing_worker, args=(logger,)
+        )
+        process.start()
+        process.join()
+        
+        logger.info("Logged after the child closed")
+        logger.close()
+        
+        with open(log_file, 'r') as f:
+            assert "Logged after the child closed" in f.read()
+
+
+def same_name_worker(mp_queue):
+    """Worker process that forwards through a new logger named like the parent's."""
+    # The parent's loggers are forgotten, so its handlers are not reconfigured
+    assert "fork_same_name" not in JMTLogger._REGISTRY
+    logger = JMTLogger(name="fork_same_name", mp_queue=mp_queue, forward_only=True)
+    logger.info("Forwarded by the child")
+    logger.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method"
+)
+def test_forked_child_reuses_logger_name():
+    """Test that a forked child creating a logger with the parent's name leaves the parent's handlers alone."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, "same_name.log")
+        mp_queue = multiprocessing.Queue()
+        logger = JMTLogger(
+            name="fork_same_name",
+            mp_queue=mp_queue,
+            log_to_file=True,
+            log_file=log_file,
+            log_to_console=False
+        )
+        logger.info("Logged before the fork")
+        
+        process = multiprocessing.get_context("fork").Process(
+            target=same_name_worker, args=(mp_queue,)
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        
+        logger.info("Logged after the fork")
+        logger.close()
+        
+        with open(log_file, 'r') as f:
+            content = f.read()
+        
+        assert "Logged before the fork" in content
+        assert "Forwarded by the child" in content
+        assert "Logged after the fork" in content
+
+
+def unclosed_worker(log_file: str, num_messages: int):
+    """Worker process that logs to a file and exits without closing its logger."""
+    logger = JMTLogger(
+        name="unclosed_worker",
+        log_to_file=True,
+        log_file=log_file,
+        log_to_console=False
+    )
+    for i in range(num_messages):
+        logger.info("Unclosed message %d", i)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method"
+)
+def test_forked_worker_flushes_without_close():
+    """Test that a forked worker's buffered records are written when it exits without close()."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, "unclosed.log")
+        process = multiprocessing.get_context("fork").Process(
+            target=unclosed_worker, args=(log_file, 15)
+        )
+        process.start()
+        process.join()
+        
+        with open(log_file, 'r') as f:
+            assert f.read().count("Unclosed message") == 15
+
+
+def rotating_worker(worker_id: int, log_file: str, num_messages: int):
+    """Worker process that writes every record straight through to a small rotating file."""
+    logger = JMTLogger(
+        name=f"rotating_worker_{worker_id}",
+        log_to_file=True,
+        log_file=log_file,
+        log_to_console=False,
+        max_file_size=2048,
+        backup_count=100,
+        flush_threshold=0
+    )
+    
+    for i in range(num_messages):
+        logger.info("Worker %d - Message %d", worker_id, i)
+    
+    logger.close()
+
+
+def test_multiprocess_rotation_keeps_every_line():
+    """Test that processes appending and rotating one file lose or tear no lines."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_path = os.path.join(temp_dir, "rotating.log")
+        num_processes = 4
+        messages_per_process = 200
+        
+        processes = [
+            multiprocessing.Process(
+                target=rotating_worker,
+                args=(worker_id, log_path, messages_per_process)
+            )
+            for worker_id in range(num_processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        
+        lines = []
+        for path in Path(temp_dir).glob("rotating.log*"):
+            lines.extend(path.read_text().splitlines())
+        
+        messages = sorted(line.split(" - ")[-1] for line in lines)
+        expected = sorted(
+            f"Message {i}" for _ in range(num_processes) for i in range(messages_per_process)
+        )
+        assert messages == expected
+
+
 if __name__ == "__main__":
     multiprocessing.freeze_support()
     test_multiprocessing_logging()
+    test_shared_queue_logging(multiprocessing.Queue)
+    test_shared_queue_logging(multiprocessing.SimpleQueue)
+    test_forked_child_inherits_logger()
+    test_forked_child_close_keeps_parent_listener()
+    test_forked_child_reuses_logger_name()
+    test_forked_worker_flushes_without_close()
+    test_multiprocess_rotation_keeps_every_line()
     print("Multiprocessing test passed!")